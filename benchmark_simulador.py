@@ -0,0 +1,209 @@
+"""Benchmark do simulador Par ou Ímpar.
+
+Mede vazão (simulações/s), latência e pico de memória de cada motor de
+SimuladorParOuImpar.simular, do intervalo de confiança e do
+pós-processamento de exibir_resultados, para n de 10^3 a 10^8. Grava os
+resultados em JSON e, com --baseline, falha quando a latência ou o pico
+de memória de alguma medida piora mais que a tolerância correspondente em
+relação a uma execução anterior.
+
+Uso:
+    python benchmark_simulador.py --saida bench.json
+    python benchmark_simulador.py --baseline bench.json --tolerancia 15 --tolerancia-memoria 5
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+from simulador import (
+    LIMITE_MODO_VETORIZADO,
+    ResultadoSimulacao,
+    SimuladorParOuImpar,
+    intervalo_wilson,
+)
+
+MODOS = ['vetorizado', 'streaming', 'paralelo', 'paridade', 'compilado', 'estratificado', 'antitetico', 'hipercubo']
+
+# Chamadas por medição das operações rápidas (intervalo de confiança, pós-processamento)
+CHAMADAS_OPERACOES_RAPIDAS = 200
+
+
+def medir(funcao, repeticoes):
+    """Executa funcao repeticoes vezes e devolve as durações (perf_counter)."""
+    duracoes = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        duracoes.append(time.perf_counter() - inicio)
+    return duracoes
+
+
+def medir_pico_memoria(funcao):
+    """Pico de memória alocada (bytes) durante uma execução de funcao."""
+    tracemalloc.start()
+    try:
+        funcao()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def pos_processamento(simulador, resultado, confianca=0.95):
+    """Reproduz os cálculos de exibir_resultados, sem renderizar nada."""
+    # Os agregados ficam em cache no resultado; uma cópia fresca mede o custo real
+    resultado = ResultadoSimulacao(
+        resultado.min_numero, resultado.max_numero, resultado.n_simulacoes, resultado.seed,
+        resultado.modo, resultado.vitorias_par, resultado.tempo_execucao,
+        resultado.histograma_somas, resultado.media_somas, resultado.desvio_padrao_somas
+    )
+    simulador.calcular_intervalo_confianca(resultado.vitorias_par, resultado.n_simulacoes, confianca)
+    if resultado.tem_somas:
+        resultado.tabela_frequencias()
+        resultado.estatisticas_somas()
+        simulador.distribuicao_somas_teorica()
+
+
+def registro(operacao, n, duracoes, pico_memoria, itens_por_chamada=1):
+    """Monta o registro JSON de uma medição."""
+    melhor = min(duracoes)
+    return {
+        'operacao': operacao,
+        'n': n,
+        'repeticoes': len(duracoes),
+        'latencia_min_s': melhor,
+        'latencia_mediana_s': statistics.median(duracoes),
+        'vazao_por_s': itens_por_chamada / melhor if melhor > 0 else None,
+        'pico_memoria_bytes': pico_memoria
+    }
+
+
+def executar_benchmark(valores_n, modos, repeticoes, min_numero, max_numero, n_processos):
+    """Executa todas as medições e devolve a lista de registros."""
+    simulador = SimuladorParOuImpar(min_numero, max_numero)
+    registros = []
+
+    for modo in modos:
+        for n in valores_n:
+            if modo == 'vetorizado' and n > LIMITE_MODO_VETORIZADO:
+                continue
+
+            def simular():
+                return simulador.simular(n, 42, modo=modo, n_processos=n_processos)
+
+            # Aquecimento (importações tardias, pool de processos, caches da CPU)
+            resultado = simular()
+            duracoes = medir(simular, repeticoes)
+            pico = medir_pico_memoria(simular)
+            registros.append(registro(f"simular[{modo}]", n, duracoes, pico, itens_por_chamada=n))
+            print(f"simular[{modo:<10}] n={n:>11,}  {min(duracoes):9.4f}s  "
+                  f"{n / min(duracoes):14,.0f} sim/s  pico {pico / 1e6:8.2f} MB")
+
+            if modo == modos[0] or n == valores_n[-1]:
+                duracoes = [d / CHAMADAS_OPERACOES_RAPIDAS for d in medir(
+                    lambda: [pos_processamento(simulador, resultado) for _ in range(CHAMADAS_OPERACOES_RAPIDAS)],
+                    repeticoes
+                )]
+                pico = medir_pico_memoria(lambda: pos_processamento(simulador, resultado))
+                registros.append(registro(f"pos_processamento[{modo}]", n, duracoes, pico))
+
+    vitorias = np.arange(CHAMADAS_OPERACOES_RAPIDAS)
+    duracoes = [d / CHAMADAS_OPERACOES_RAPIDAS for d in medir(
+        lambda: [simulador.calcular_intervalo_confianca(v, CHAMADAS_OPERACOES_RAPIDAS) for v in vitorias],
+        repeticoes
+    )]
+    registros.append(registro("calcular_intervalo_confianca", 1, duracoes, 0))
+
+    duracoes = medir(lambda: intervalo_wilson(vitorias, CHAMADAS_OPERACOES_RAPIDAS), repeticoes)
+    registros.append(registro("intervalo_wilson[vetorizado]", CHAMADAS_OPERACOES_RAPIDAS, duracoes, 0,
+                              itens_por_chamada=CHAMADAS_OPERACOES_RAPIDAS))
+
+    return registros
+
+
+def comparar_com_baseline(registros, baseline, tolerancia, tolerancia_memoria):
+    """Lista as medições que pioraram em relação ao baseline.
+    
+    A latência mínima é comparada com tolerancia (%) e o pico de memória com
+    tolerancia_memoria (%); operações sem pico medido no baseline não entram
+    na comparação de memória.
+    """
+    anteriores = {(r['operacao'], r['n']): r for r in baseline['resultados']}
+    regressoes = []
+    for atual in registros:
+        anterior = anteriores.get((atual['operacao'], atual['n']))
+        if anterior is None:
+            continue
+        for medida, limite in (('latencia_min_s', tolerancia), ('pico_memoria_bytes', tolerancia_memoria)):
+            if not anterior.get(medida):
+                continue
+            piora = (atual[medida] / anterior[medida] - 1) * 100
+            if piora > limite:
+                regressoes.append((atual['operacao'], atual['n'], medida, anterior[medida], atual[medida], piora))
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do simulador Par ou Ímpar")
+    parser.add_argument('--expoente-min', type=int, default=3, help="menor n = 10^expoente (padrão: 3)")
+    parser.add_argument('--expoente-max', type=int, default=8, help="maior n = 10^expoente (padrão: 8)")
+    parser.add_argument('--modos', nargs='+', choices=MODOS, default=MODOS)
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--min-numero', type=int, default=0)
+    parser.add_argument('--max-numero', type=int, default=20)
+    parser.add_argument('--processos', type=int, default=None, help="processos dos motores paralelos")
+    parser.add_argument('--saida', help="arquivo JSON para gravar os resultados")
+    parser.add_argument('--baseline', help="JSON de uma execução anterior para comparação")
+    parser.add_argument('--tolerancia', type=float, default=10.0,
+                        help="piora máxima de latência aceita em relação ao baseline, em %% (padrão: 10)")
+    parser.add_argument('--tolerancia-memoria', type=float, default=10.0,
+                        help="piora máxima do pico de memória aceita em relação ao baseline, em %% (padrão: 10)")
+    args = parser.parse_args()
+
+    valores_n = [10 ** expoente for expoente in range(args.expoente_min, args.expoente_max + 1)]
+    registros = executar_benchmark(valores_n, args.modos, args.repeticoes,
+                                   args.min_numero, args.max_numero, args.processos)
+
+    saida = {
+        'metadados': {
+            'data': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'plataforma': platform.platform(),
+            'cpus': os.cpu_count(),
+            'intervalo': [args.min_numero, args.max_numero],
+            'processos': args.processos
+        },
+        'resultados': registros
+    }
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            json.dump(saida, arquivo, indent=2, ensure_ascii=False)
+        print(f"Resultados gravados em {args.saida}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as arquivo:
+            baseline = json.load(arquivo)
+        regressoes = comparar_com_baseline(registros, baseline, args.tolerancia, args.tolerancia_memoria)
+        limites = f"{args.tolerancia:.0f}% (latência) / {args.tolerancia_memoria:.0f}% (memória)"
+        if regressoes:
+            print(f"\n❌ {len(regressoes)} regressão(ões) acima de {limites}:")
+            for operacao, n, medida, anterior, atual, piora in regressoes:
+                if medida == 'latencia_min_s':
+                    print(f"  {operacao} n={n:,}: {anterior:.6f}s -> {atual:.6f}s (+{piora:.1f}%)")
+                else:
+                    print(f"  {operacao} n={n:,}: pico {anterior / 1e6:.2f} MB -> {atual / 1e6:.2f} MB (+{piora:.1f}%)")
+            return 1
+        print(f"\n✅ Nenhuma regressão acima de {limites} em relação a {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
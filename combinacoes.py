@@ -0,0 +1,337 @@
+"""Geração de combinações de produtos para os totais de cada forma de pagamento.
+
+Funções sem dependência do Streamlit, usadas por gestao(5).py. Ficam em um
+módulo importável para poderem ser enviadas a um ProcessPoolExecutor.
+Identificadores seguem o inglês das funções originais (calculate_*,
+generate_*); comentários ficam em português.
+"""
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from collections import OrderedDict
+
+# Número máximo de combinações por forma de pagamento mantidas no cache
+COMBINATION_CACHE_CAPACITY = 256
+
+# Recozimento simulado: reinícios por orçamento de tempo, movimentos entre leituras do relógio
+# e temperatura final como fração da inicial
+ANNEALING_RESTARTS = 4
+ANNEALING_BATCH = 1024
+ANNEALING_FINAL_TEMPERATURE = 1e-3
+
+def calculate_combination_value(combination, item_prices):
+    """Calculates the total value of a combination based on item prices."""
+    return sum(item_prices.get(name, 0) * quantity for name, quantity in combination.items())
+
+def round_to_50_or_00(value):
+    """Arredonda para o múltiplo de 0.50 mais próximo"""
+    return round(value * 2) / 2
+
+def generate_initial_combination(item_prices, combination_size, rng=random):
+    """Generates a random initial combination for the local search."""
+    combination = {}
+    item_names = list(item_prices.keys())
+    if not item_names:
+        return combination
+    size = min(combination_size, len(item_names))
+    chosen_names = rng.sample(item_names, size)
+    for name in chosen_names:
+        combination[name] = round_to_50_or_00(rng.uniform(1, 10))
+    return combination
+
+# Movimentos da busca local, em meias unidades: -0,50, +0,50, -1,00 e +1,00
+NEIGHBOR_STEPS = (-1, 1, -2, 2)
+
+def local_search_optimization(item_prices, target_value, combination_size, max_iterations, rng=random):
+    """
+    Versão modificada para:
+    - Valores terminarem em ,00 ou ,50
+    - Nunca ultrapassar o target_value
+    - Sorteios feitos por rng (um random.Random com seed torna o resultado reprodutível)
+    """
+    if not item_prices or target_value <= 0:
+        return {}
+
+    initial_combination = generate_initial_combination(item_prices, combination_size, rng)
+    names = list(initial_combination.keys())
+    if not names:
+        return {}
+
+    # Vetores por posição: preço em centavos e quantidade em meias unidades; valores em meios centavos
+    prices = [int(round(item_prices[name] * 100)) for name in names]
+    halves = [int(round(initial_combination[name] * 2)) for name in names]
+    target = int(round(target_value * 100)) * 2
+    penalty = 10000 * 200
+    value = sum(price * quantity for price, quantity in zip(prices, halves))
+    best_diff = abs(target - value) + (penalty if value > target else 0)
+
+    # Todos os sorteios de uma vez, entre os movimentos pré-calculados (item, passo, variação do valor)
+    neighbor_moves = [(item, step, prices[item] * step) for item in range(len(names)) for step in NEIGHBOR_STEPS]
+    for item, step, delta in rng.choices(neighbor_moves, k=max_iterations):
+        if best_diff == 0:
+            break
+        new_quantity = halves[item] + step
+        if new_quantity < 1:
+            # Quantidade mínima de 0,50: a variação passa a ser só até o mínimo
+            delta = prices[item] * (1 - halves[item])
+            new_quantity = 1
+
+        # Avaliação pela variação do único item alterado
+        neighbor_value = value + delta
+        neighbor_diff = target - neighbor_value
+        if neighbor_diff < 0:
+            neighbor_diff = penalty - neighbor_diff
+
+        if neighbor_diff < best_diff:
+            best_diff = neighbor_diff
+            value = neighbor_value
+            halves[item] = new_quantity
+
+    return {name: quantity / 2 for name, quantity in zip(names, halves)}
+
+def annealing_optimization(item_prices, target_value, combination_size, time_budget_ms, rng=random):
+    """
+    Recozimento simulado com reinícios aleatórios, limitado por tempo (anytime):
+    - Mesmos movimentos da busca local (±0,50 e ±1,00, mínimo de 0,50)
+    - Pioras aceitas com probabilidade exp(-piora / temperatura), que esfria a cada reinício
+    - Retorna a melhor combinação encontrada no prazo e o número de iterações usadas
+    """
+    if not item_prices or target_value <= 0:
+        return {}, 0
+
+    deadline = time.perf_counter() + time_budget_ms / 1000
+    restart_duration = time_budget_ms / 1000 / ANNEALING_RESTARTS
+    target = int(round(target_value * 100)) * 2
+    penalty = 10000 * 200
+    best_combination, best_diff = {}, None
+    iterations = 0
+
+    for restart in range(ANNEALING_RESTARTS):
+        initial_combination = generate_initial_combination(item_prices, combination_size, rng)
+        names = list(initial_combination.keys())
+        if not names:
+            break
+        # Mesma representação da busca local: centavos, meias unidades e valores em meios centavos
+        prices = [int(round(item_prices[name] * 100)) for name in names]
+        halves = [int(round(initial_combination[name] * 2)) for name in names]
+        value = sum(price * quantity for price, quantity in zip(prices, halves))
+        diff = abs(target - value) + (penalty if value > target else 0)
+        if best_diff is None or diff < best_diff:
+            best_diff, best_combination = diff, dict(zip(names, halves))
+
+        neighbor_moves = [(item, step, prices[item] * step) for item in range(len(names)) for step in NEIGHBOR_STEPS]
+        # Temperatura inicial na escala de um movimento típico; esfria geometricamente com o tempo
+        initial_temperature = sum(abs(delta) for _, _, delta in neighbor_moves) / len(neighbor_moves)
+        restart_start = time.perf_counter()
+        restart_end = min(restart_start + restart_duration, deadline)
+
+        now = restart_start
+        while now < restart_end and best_diff > 0:
+            progress = (now - restart_start) / restart_duration
+            temperature = initial_temperature * ANNEALING_FINAL_TEMPERATURE ** progress
+            for item, step, delta in rng.choices(neighbor_moves, k=ANNEALING_BATCH):
+                iterations += 1
+                new_quantity = halves[item] + step
+                if new_quantity < 1:
+                    delta = prices[item] * (1 - halves[item])
+                    new_quantity = 1
+
+                neighbor_value = value + delta
+                neighbor_diff = target - neighbor_value
+                if neighbor_diff < 0:
+                    neighbor_diff = penalty - neighbor_diff
+
+                if neighbor_diff <= diff or rng.random() < math.exp((diff - neighbor_diff) / temperature):
+                    diff = neighbor_diff
+                    value = neighbor_value
+                    halves[item] = new_quantity
+                    if diff < best_diff:
+                        best_diff, best_combination = diff, dict(zip(names, halves))
+                        if best_diff == 0:
+                            break
+            now = time.perf_counter()
+
+        if best_diff == 0 or now >= deadline:
+            break
+
+    return {name: quantity / 2 for name, quantity in best_combination.items()}, iterations
+
+def exact_combination_optimization(item_prices, target_value, combination_size):
+    """
+    Solução exata por programação dinâmica (mochila inteira):
+    - Quantidades inteiras de no máximo combination_size itens diferentes
+    - Valor total mais próximo possível do target_value, sem ultrapassá-lo
+    """
+    if not item_prices or target_value <= 0 or combination_size <= 0:
+        return {}
+
+    # Preços em centavos, divididos pelo MDC (R$ 0,50 -> 1 unidade quando todos são múltiplos de 0,50)
+    prices_cents = {name: int(round(price * 100)) for name, price in item_prices.items() if price > 0}
+    if not prices_cents:
+        return {}
+    unit = math.gcd(*prices_cents.values())
+    names = list(prices_cents.keys())
+    prices = [prices_cents[name] // unit for name in names]
+    capacity = int(round(target_value * 100)) // unit
+    max_items = min(combination_size, len(names))
+    mask = (1 << (capacity + 1)) - 1
+
+    # reachable[i][j]: bits dos totais alcançáveis com j itens diferentes entre os i primeiros
+    reachable = [[1] + [0] * max_items]
+    for price in prices:
+        previous = reachable[-1]
+        layer = previous[:]
+        for j in range(1, max_items + 1):
+            # Pelo menos uma unidade do item sobre os totais com j-1 itens, depois quantidades extras
+            with_item = (previous[j - 1] << price) & mask
+            step = price
+            while with_item and step <= capacity:
+                with_item |= (with_item << step) & mask
+                step *= 2
+            layer[j] |= with_item
+        reachable.append(layer)
+
+    best_value, best_count = 0, 0
+    for j in range(max_items + 1):
+        value = reachable[-1][j].bit_length() - 1
+        # Empate no valor: prefere a combinação com mais itens diferentes
+        if value >= best_value:
+            best_value, best_count = value, j
+
+    combination = {}
+    value, count = best_value, best_count
+    for i in range(len(names), 0, -1):
+        if (reachable[i - 1][count] >> value) & 1:
+            continue
+        price = prices[i - 1]
+        quantity = 1
+        while not (reachable[i - 1][count - 1] >> (value - quantity * price)) & 1:
+            quantity += 1
+        combination[names[i - 1]] = quantity
+        value -= quantity * price
+        count -= 1
+
+    return {name: combination[name] for name in names if name in combination}
+
+def optimize_combination(item_prices, target_value, combination_size, method, max_iterations, rng=random,
+                         time_budget_ms=None):
+    """
+    Gera a combinação pelo método escolhido ('exato', 'heuristico' ou 'anytime').
+    Retorna (combinação, iterações usadas); as iterações só são contadas no método anytime.
+    """
+    if method == 'exato':
+        return exact_combination_optimization(item_prices, target_value, combination_size), None
+    if method == 'anytime':
+        return annealing_optimization(item_prices, target_value, combination_size, time_budget_ms, rng)
+    return local_search_optimization(item_prices, target_value, combination_size, max_iterations, rng), None
+
+def generate_payment_combination(total_pagamento, bebidas_precos, sanduiches_precos, drink_percentage,
+                                 tamanho_bebidas, tamanho_sanduiches, method, max_iterations, seed=None,
+                                 time_budget_ms=None):
+    """
+    Gera as combinações de bebidas e sanduíches de uma forma de pagamento.
+    Com a mesma seed o resultado é sempre o mesmo, em qualquer processo (no
+    método anytime, o ponto de parada depende também da velocidade da CPU).
+    time_budget_ms é o prazo da forma inteira, dividido entre as duas buscas.
+    Função de módulo para poder ser enviada a um ProcessPoolExecutor.
+    """
+    rng = random.Random(seed)
+    target_bebidas = round_to_50_or_00(total_pagamento * (drink_percentage / 100.0))
+    target_sanduiches = round_to_50_or_00(total_pagamento - target_bebidas)
+
+    budget_per_search = time_budget_ms / 2 if time_budget_ms else None
+    comb_bebidas, iterations_bebidas = optimize_combination(
+        bebidas_precos, target_bebidas, tamanho_bebidas, method, max_iterations, rng, budget_per_search
+    )
+    comb_sanduiches, iterations_sanduiches = optimize_combination(
+        sanduiches_precos, target_sanduiches, tamanho_sanduiches, method, max_iterations, rng, budget_per_search
+    )
+
+    comb_bebidas_rounded = {name: round(qty) for name, qty in comb_bebidas.items() if round(qty) > 0}
+    comb_sanduiches_rounded = {name: round(qty) for name, qty in comb_sanduiches.items() if round(qty) > 0}
+
+    total_bebidas_inicial = calculate_combination_value(comb_bebidas_rounded, bebidas_precos)
+    total_sanduiches_inicial = calculate_combination_value(comb_sanduiches_rounded, sanduiches_precos)
+    total_geral_inicial = total_bebidas_inicial + total_sanduiches_inicial
+
+    comb_sanduiches_final, total_sanduiches_final = comb_sanduiches_rounded.copy(), total_sanduiches_inicial
+
+    if total_geral_inicial < total_pagamento and "Cebola" in sanduiches_precos:
+        diferenca = total_pagamento - total_geral_inicial
+        preco_cebola = sanduiches_precos["Cebola"]
+        cebolas_adicionar = min(int(round(diferenca / preco_cebola)), 20)
+        if cebolas_adicionar > 0:
+            comb_sanduiches_final["Cebola"] = comb_sanduiches_final.get("Cebola", 0) + cebolas_adicionar
+            total_sanduiches_final = calculate_combination_value(comb_sanduiches_final, sanduiches_precos)
+
+    total_bebidas_final = calculate_combination_value(comb_bebidas_rounded, bebidas_precos)
+
+    return {
+        'target_bebidas': target_bebidas,
+        'target_sanduiches': target_sanduiches,
+        'comb_bebidas': comb_bebidas_rounded,
+        'comb_sanduiches': comb_sanduiches_rounded,
+        'comb_sanduiches_final': comb_sanduiches_final,
+        'total_bebidas': total_bebidas_final,
+        'total_sanduiches': total_sanduiches_final,
+        'total_geral': total_bebidas_final + total_sanduiches_final,
+        # Distância das combinações exibidas (arredondadas, com o ajuste de cebola) até cada meta
+        'gap_bebidas': target_bebidas - total_bebidas_final,
+        'gap_sanduiches': target_sanduiches - total_sanduiches_final,
+        'iterations_bebidas': iterations_bebidas,
+        'iterations_sanduiches': iterations_sanduiches
+    }
+
+def menu_hash(item_prices):
+    """Resumo estável do cardápio (nomes e preços), usado nas chaves do cache."""
+    content = json.dumps(sorted(item_prices.items()), ensure_ascii=False)
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()[:16]
+
+class CombinationCache:
+    """Cache LRU das combinações por forma de pagamento, compartilhado entre sessões.
+    
+    A chave reúne os cardápios (por hash), o total e a divisão entre bebidas
+    e sanduíches, os tamanhos das combinações, o método, o orçamento
+    (iterações ou tempo) e a seed. Como a busca é semeada, a mesma chave
+    corresponde ao mesmo resultado; no método anytime, o cache mantém o
+    primeiro resultado obtido no prazo.
+    """
+    
+    def __init__(self, capacity=COMBINATION_CACHE_CAPACITY):
+        self.capacity = capacity
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def key(total_pagamento, bebidas_precos, sanduiches_precos, drink_percentage,
+            tamanho_bebidas, tamanho_sanduiches, method, max_iterations, seed, time_budget_ms=None):
+        """Monta a chave com os mesmos argumentos de generate_payment_combination."""
+        if method == 'exato':
+            # O método exato é determinístico e não usa iterações: entradas compartilhadas
+            max_iterations, seed, time_budget_ms = None, None, None
+        elif method == 'anytime':
+            max_iterations = None
+        else:
+            time_budget_ms = None
+        return (menu_hash(bebidas_precos), menu_hash(sanduiches_precos), int(round(total_pagamento * 100)),
+                drink_percentage, tamanho_bebidas, tamanho_sanduiches, method, max_iterations, seed,
+                time_budget_ms)
+    
+    def get(self, key):
+        """Retorna o resultado em cache ou None."""
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                return self._items[key]
+        return None
+    
+    def put(self, key, result):
+        """Guarda o resultado, descartando os menos usados além da capacidade."""
+        with self._lock:
+            self._items[key] = result
+            self._items.move_to_end(key)
+            while len(self._items) > self.capacity:
+                self._items.popitem(last=False)
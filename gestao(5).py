@@ -2,8 +2,11 @@ import streamlit as st
 import pandas as pd
 import altair as alt
 from datetime import datetime
-import random
 import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from combinacoes import CombinationCache, calculate_combination_value, generate_payment_combination
 
 # --- CONFIGURAÇÃO DA PÁGINA (DEVE SER A PRIMEIRA CHAMADA STREAMLIT) ---
 st.set_page_config(page_title="Gestão - Clips Burger", layout="centered", initial_sidebar_state="expanded")
@@ -33,61 +36,6 @@ def parse_menu_string(menu_data_string):
             st.warning(f"Formato inválido na linha do cardápio: '{line}'. Ignorando linha.")
     return menu
 
-def calculate_combination_value(combination, item_prices):
-    """Calculates the total value of a combination based on item prices."""
-    return sum(item_prices.get(name, 0) * quantity for name, quantity in combination.items())
-
-def round_to_50_or_00(value):
-    """Arredonda para o múltiplo de 0.50 mais próximo"""
-    return round(value * 2) / 2
-
-def generate_initial_combination(item_prices, combination_size):
-    """Generates a random initial combination for the local search."""
-    combination = {}
-    item_names = list(item_prices.keys())
-    if not item_names:
-        return combination
-    size = min(combination_size, len(item_names))
-    chosen_names = random.sample(item_names, size)
-    for name in chosen_names:
-        combination[name] = round_to_50_or_00(random.uniform(1, 10))
-    return combination
-
-def local_search_optimization(item_prices, target_value, combination_size, max_iterations):
-    """
-    Versão modificada para:
-    - Valores terminarem em ,00 ou ,50
-    - Nunca ultrapassar o target_value
-    """
-    if not item_prices or target_value <= 0:
-        return {}
-
-    best_combination = generate_initial_combination(item_prices, combination_size)
-    best_combination = {k: round_to_50_or_00(v) for k, v in best_combination.items()}
-    current_value = calculate_combination_value(best_combination, item_prices)
-
-    best_diff = abs(target_value - current_value) + (10000 if current_value > target_value else 0)
-    current_items = list(best_combination.keys())
-
-    for _ in range(max_iterations):
-        if not current_items: break
-
-        neighbor = best_combination.copy()
-        item_to_modify = random.choice(current_items)
-
-        change = random.choice([-0.50, 0.50, -1.00, 1.00])
-        neighbor[item_to_modify] = round_to_50_or_00(neighbor[item_to_modify] + change)
-        neighbor[item_to_modify] = max(0.50, neighbor[item_to_modify])
-
-        neighbor_value = calculate_combination_value(neighbor, item_prices)
-        neighbor_diff = abs(target_value - neighbor_value) + (10000 if neighbor_value > target_value else 0)
-
-        if neighbor_diff < best_diff:
-            best_diff = neighbor_diff
-            best_combination = neighbor
-
-    return best_combination
-
 def format_currency(value):
     """Formats a number as Brazilian Real currency."""
     if pd.isna(value):
@@ -144,6 +92,122 @@ def display_receipts_table(df):
     else:
         st.info("Nenhum dado de recebimento cadastrado.")
 
+def display_payment_combination(forma, total_pagamento, resultado, bebidas_precos, sanduiches_precos):
+    """Exibe o expander com as combinações geradas para uma forma de pagamento."""
+    target_bebidas, target_sanduiches = resultado['target_bebidas'], resultado['target_sanduiches']
+    comb_bebidas_rounded = resultado['comb_bebidas']
+    comb_sanduiches_rounded = resultado['comb_sanduiches']
+    comb_sanduiches_final = resultado['comb_sanduiches_final']
+    total_bebidas_final = resultado['total_bebidas']
+    total_sanduiches_final = resultado['total_sanduiches']
+    total_geral_final = resultado['total_geral']
+
+    with st.expander(f"**{forma}** (Total: {format_currency(total_pagamento)})", expanded=False):
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.subheader(f"🍹 Bebidas: {format_currency(target_bebidas)}")
+            if comb_bebidas_rounded:
+                for nome, qtt in comb_bebidas_rounded.items():
+                    val_item = bebidas_precos[nome] * qtt
+                    st.markdown(f"- **{qtt}** **{nome}:** {format_currency(val_item)}")
+                st.divider()
+                st.metric("Total Calculado", format_currency(total_bebidas_final))
+            else:
+                st.info("Nenhuma bebida na combinação")
+
+        with col2:
+            st.subheader(f"🍔 Sanduíches: {format_currency(target_sanduiches)}")
+            if comb_sanduiches_final:
+                original_sandwich_value = calculate_combination_value(comb_sanduiches_rounded, sanduiches_precos)
+                has_onion_adjustment = "Cebola" in comb_sanduiches_final and comb_sanduiches_final.get("Cebola", 0) > comb_sanduiches_rounded.get("Cebola", 0)
+
+                for nome, qtt in comb_sanduiches_final.items():
+                    display_name = nome
+                    prefix = ""
+
+                    if nome == "Cebola" and has_onion_adjustment:
+                        display_name = "Cebola (Ajuste)"
+                        prefix = "🔹 "
+
+                    val_item = sanduiches_precos[nome] * qtt
+                    st.markdown(f"- {prefix}**{qtt}** **{display_name}:** {format_currency(val_item)}")
+
+                st.divider()
+                st.metric("Total Calculado", format_currency(total_sanduiches_final))
+            else:
+                st.info("Nenhum sanduíche na combinação")
+
+        if resultado['iterations_bebidas'] is not None:
+            st.caption(
+                f"⏱️ {resultado['iterations_bebidas'] + resultado['iterations_sanduiches']:,} iterações | "
+                f"Distância da meta: bebidas {format_currency(resultado['gap_bebidas'])}, "
+                f"sanduíches {format_currency(resultado['gap_sanduiches'])}"
+            )
+
+        st.divider()
+        diff = total_geral_final - total_pagamento
+        st.metric(
+            "💰 TOTAL GERAL (Calculado)",
+            format_currency(total_geral_final),
+            delta=f"{format_currency(diff)} vs Meta",
+            delta_color="normal" if diff <= 0 else "inverse"
+        )
+
+@st.cache_resource
+def get_process_pool():
+    """Pool de processos compartilhado entre reruns para as otimizações das formas de pagamento."""
+    # fork copiaria um servidor com várias threads (e suas travas) para os processos auxiliares.
+    # Com forkserver/spawn, cada processo reexecuta esta página como __mp_main__, sem sessão:
+    # nenhum arquivo é enviado e o pool não é usado, então só as funções ficam carregadas.
+    metodo = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=multiprocessing.get_context(metodo))
+
+def discard_process_pool(pool):
+    """Encerra um pool quebrado e o remove do cache, para que a próxima chamada crie outro."""
+    pool.shutdown(wait=False, cancel_futures=True)
+    get_process_pool.clear()
+
+def compute_payment_combinations(argumentos):
+    """Gera (forma, resultado, erro) para cada forma, à medida que as otimizações terminam.
+    
+    A falha de uma forma não interrompe as demais. Se um processo auxiliar
+    morrer, o pool fica quebrado: ele é descartado e recriado na próxima vez.
+    """
+    if (os.cpu_count() or 1) <= 1:
+        for forma, args in argumentos.items():
+            try:
+                resultado, erro = generate_payment_combination(*args), None
+            except Exception as falha:
+                resultado, erro = None, falha
+            yield forma, resultado, erro
+        return
+
+    pool = get_process_pool()
+    try:
+        futuros = {pool.submit(generate_payment_combination, *args): forma for forma, args in argumentos.items()}
+    except BrokenProcessPool:
+        # O pool quebrou entre reruns: recria uma vez antes de desistir
+        discard_process_pool(pool)
+        pool = get_process_pool()
+        futuros = {pool.submit(generate_payment_combination, *args): forma for forma, args in argumentos.items()}
+
+    pool_quebrado = False
+    for futuro in as_completed(futuros):
+        try:
+            resultado, erro = futuro.result(), None
+        except Exception as falha:
+            resultado, erro = None, falha
+            pool_quebrado = pool_quebrado or isinstance(falha, BrokenProcessPool)
+        yield futuros[futuro], resultado, erro
+    if pool_quebrado:
+        discard_process_pool(pool)
+
+@st.cache_resource
+def get_combination_cache():
+    """Cache único das combinações, compartilhado por todas as sessões do servidor."""
+    return CombinationCache()
+
 # ----- Interface Streamlit -----
 
 # Colunas para Título e Logo
@@ -188,12 +252,39 @@ with st.sidebar:
         "Número de tipos de Sanduíches",
         min_value=1, max_value=10, value=5, step=1
     )
+    nomes_metodos = {
+        'exato': "Exato (programação dinâmica)",
+        'heuristico': "Heurístico (busca local)",
+        'anytime': "Anytime (recozimento simulado)"
+    }
+    metodo_otimizacao = st.radio(
+        "Método de Otimização 🧮",
+        options=list(nomes_metodos),
+        format_func=nomes_metodos.get
+    )
     max_iterations = st.select_slider(
         "Qualidade da Otimização ✨",
         options=[1000, 5000, 10000, 20000, 50000],
-        value=10000
+        value=10000,
+        disabled=metodo_otimizacao != 'heuristico'
+    )
+    tempo_por_forma_ms = st.select_slider(
+        "Tempo por Forma de Pagamento (ms) ⏱️",
+        options=[50, 100, 250, 500, 1000, 2000],
+        value=250,
+        disabled=metodo_otimizacao != 'anytime'
     )
-    st.info("Lembre-se: As combinações são aproximações heurísticas.")
+    seed_combinacoes = st.number_input(
+        "Seed das Combinações 🎲",
+        min_value=0, value=42, step=1,
+        disabled=metodo_otimizacao == 'exato'
+    )
+    if metodo_otimizacao == 'exato':
+        st.info("O método exato encontra a combinação mais próxima da meta sem ultrapassá-la.")
+    elif metodo_otimizacao == 'anytime':
+        st.info("O método anytime devolve a melhor combinação encontrada dentro do prazo.")
+    else:
+        st.info("Lembre-se: As combinações são aproximações heurísticas. A mesma seed repete o resultado.")
 
 # --- Abas ---
 tab1, tab2, tab3 = st.tabs(["📈 Resumo das Vendas", "🧩 Detalhes das Combinações", "💰 Cadastro de Recebimentos"])
@@ -384,85 +475,33 @@ with tab2:
         if forma not in vendas_ordenadas:
             vendas_ordenadas[forma] = total
 
-    for forma, total_pagamento in vendas_ordenadas.items():
-        if total_pagamento <= 0:
-            continue
-
-        with st.spinner(f"Gerando combinação para {forma}..."):
-            target_bebidas = round_to_50_or_00(total_pagamento * (drink_percentage / 100.0))
-            target_sanduiches = round_to_50_or_00(total_pagamento - target_bebidas)
-
-            comb_bebidas = local_search_optimization(
-                bebidas_precos, target_bebidas, tamanho_combinacao_bebidas, max_iterations
-            )
-            comb_sanduiches = local_search_optimization(
-                sanduiches_precos, target_sanduiches, tamanho_combinacao_sanduiches, max_iterations
-            )
-
-            comb_bebidas_rounded = {name: round(qty) for name, qty in comb_bebidas.items() if round(qty) > 0}
-            comb_sanduiches_rounded = {name: round(qty) for name, qty in comb_sanduiches.items() if round(qty) > 0}
-
-            total_bebidas_inicial = calculate_combination_value(comb_bebidas_rounded, bebidas_precos)
-            total_sanduiches_inicial = calculate_combination_value(comb_sanduiches_rounded, sanduiches_precos)
-            total_geral_inicial = total_bebidas_inicial + total_sanduiches_inicial
-
-            comb_sanduiches_final, total_sanduiches_final = comb_sanduiches_rounded.copy(), total_sanduiches_inicial
-
-            if total_geral_inicial < total_pagamento and "Cebola" in sanduiches_precos:
-                diferenca = total_pagamento - total_geral_inicial
-                preco_cebola = sanduiches_precos["Cebola"]
-                cebolas_adicionar = min(int(round(diferenca / preco_cebola)), 20)
-                if cebolas_adicionar > 0:
-                    comb_sanduiches_final["Cebola"] = comb_sanduiches_final.get("Cebola", 0) + cebolas_adicionar
-                    total_sanduiches_final = calculate_combination_value(comb_sanduiches_final, sanduiches_precos)
-
-            total_bebidas_final = calculate_combination_value(comb_bebidas_rounded, bebidas_precos)
-            total_geral_final = total_bebidas_final + total_sanduiches_final
-
-            with st.expander(f"**{forma}** (Total: {format_currency(total_pagamento)})", expanded=False):
-                col1, col2 = st.columns(2)
-
-                with col1:
-                    st.subheader(f"🍹 Bebidas: {format_currency(target_bebidas)}")
-                    if comb_bebidas_rounded:
-                        for nome, qtt in comb_bebidas_rounded.items():
-                            val_item = bebidas_precos[nome] * qtt
-                            st.markdown(f"- **{qtt}** **{nome}:** {format_currency(val_item)}")
-                        st.divider()
-                        st.metric("Total Calculado", format_currency(total_bebidas_final))
-                    else:
-                        st.info("Nenhuma bebida na combinação")
-
-                with col2:
-                    st.subheader(f"🍔 Sanduíches: {format_currency(target_sanduiches)}")
-                    if comb_sanduiches_final:
-                        original_sandwich_value = calculate_combination_value(comb_sanduiches_rounded, sanduiches_precos)
-                        has_onion_adjustment = "Cebola" in comb_sanduiches_final and comb_sanduiches_final.get("Cebola", 0) > comb_sanduiches_rounded.get("Cebola", 0)
-
-                        for nome, qtt in comb_sanduiches_final.items():
-                            display_name = nome
-                            prefix = ""
-
-                            if nome == "Cebola" and has_onion_adjustment:
-                                display_name = "Cebola (Ajuste)"
-                                prefix = "🔹 "
-
-                            val_item = sanduiches_precos[nome] * qtt
-                            st.markdown(f"- {prefix}**{qtt}** **{display_name}:** {format_currency(val_item)}")
-
-                        st.divider()
-                        st.metric("Total Calculado", format_currency(total_sanduiches_final))
-                    else:
-                        st.info("Nenhum sanduíche na combinação")
-
-                st.divider()
-                diff = total_geral_final - total_pagamento
-                st.metric(
-                    "💰 TOTAL GERAL (Calculado)",
-                    format_currency(total_geral_final),
-                    delta=f"{format_currency(diff)} vs Meta",
-                    delta_color="normal" if diff <= 0 else "inverse"
-                )
+    formas_com_vendas = {forma: total for forma, total in vendas_ordenadas.items() if total > 0}
+    if formas_com_vendas:
+        # Um espaço reservado por forma, na ordem fixa; cada um é preenchido quando sua otimização termina
+        placeholders = {forma: st.empty() for forma in formas_com_vendas}
+        cache_combinacoes = get_combination_cache()
+        argumentos = {}
+        for forma, total_pagamento in formas_com_vendas.items():
+            args = (total_pagamento, bebidas_precos, sanduiches_precos, drink_percentage,
+                    tamanho_combinacao_bebidas, tamanho_combinacao_sanduiches, metodo_otimizacao,
+                    max_iterations, seed_combinacoes, tempo_por_forma_ms)
+            resultado = cache_combinacoes.get(CombinationCache.key(*args))
+            if resultado is not None:
+                # Reruns sem mudança nas entradas exibem o mesmo resultado, sem recalcular
+                with placeholders[forma].container():
+                    display_payment_combination(forma, total_pagamento, resultado, bebidas_precos, sanduiches_precos)
+            else:
+                placeholders[forma].info(f"⏳ Gerando combinação para {forma}...")
+                argumentos[forma] = args
+
+        for forma, resultado, erro in compute_payment_combinations(argumentos):
+            if erro is not None:
+                placeholders[forma].error(f"❌ Não foi possível gerar a combinação para {forma}: {erro}")
+                continue
+            cache_combinacoes.put(CombinationCache.key(*argumentos[forma]), resultado)
+            with placeholders[forma].container():
+                display_payment_combination(forma, formas_com_vendas[forma], resultado,
+                                            bebidas_precos, sanduiches_precos)
 
 # --- Tab 3: Cadastro de Recebimentos ---
 with tab3:
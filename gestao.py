@@ -5,8 +5,29 @@ import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
 import time
-from scipy import stats
+import os
+import json
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from functools import partial
 import warnings
+from simulador import (
+    LIMITE_MODO_VETORIZADO,
+    DIRETORIO_CACHE_DISCO,
+    FORMATOS_EXPORTACAO,
+    ESTRATEGIAS,
+    CacheSimulacoes,
+    SimuladorParOuImpar,
+    SimuladorMultijogador,
+    vetor_estrategia,
+    varrer_intervalos,
+    formatos_exportacao_disponiveis,
+    dados_detalhados_bytes,
+    resumir_pvalores,
+    numba_disponivel,
+    intervalo_wilson,
+)
 warnings.filterwarnings('ignore')
 
 # Configuração da página
@@ -44,65 +65,89 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-class SimuladorParOuImpar:
-    """Classe para simulação do jogo Par ou Ímpar."""
-    
-    def __init__(self, min_numero=0, max_numero=20):
-        self.min_numero = min_numero
-        self.max_numero = max_numero
-        self.range_numeros = max_numero - min_numero + 1
-        self.prob_teorica_par, self.prob_teorica_impar = self._calcular_probabilidades_teoricas()
-    
-    def _calcular_probabilidades_teoricas(self):
-        """Calcula probabilidades teóricas exatas."""
-        total_combinacoes = self.range_numeros ** 2
-        combinacoes_par = sum(
-            1 for i in range(self.min_numero, self.max_numero + 1)
-            for j in range(self.min_numero, self.max_numero + 1)
-            if (i + j) % 2 == 0
-        )
-        prob_par = combinacoes_par / total_combinacoes
-        return prob_par, 1 - prob_par
+class RastreioMemoria:
+    """Posse do tracemalloc, que é global no processo.
     
-    def simular(self, n_simulacoes, seed=None):
-        """Executa simulação Monte Carlo."""
-        if seed:
-            np.random.seed(seed)
-        
-        inicio = time.time()
-        
-        # Geração vetorizada
-        numeros_j1 = np.random.randint(self.min_numero, self.max_numero + 1, n_simulacoes)
-        numeros_j2 = np.random.randint(self.min_numero, self.max_numero + 1, n_simulacoes)
-        somas = numeros_j1 + numeros_j2
-        
-        vitorias_par = np.sum(somas % 2 == 0)
-        vitorias_impar = n_simulacoes - vitorias_par
-        
-        tempo_execucao = time.time() - inicio
-        
-        return {
-            'vitorias_par': vitorias_par,
-            'vitorias_impar': vitorias_impar,
-            'prob_par_obs': vitorias_par / n_simulacoes,
-            'prob_impar_obs': vitorias_impar / n_simulacoes,
-            'tempo_execucao': tempo_execucao,
-            'somas': somas,
-            'numeros_j1': numeros_j1,
-            'numeros_j2': numeros_j2
-        }
+    Só a etapa que detém a trava inicia, zera o pico e para o rastreio. As
+    simulações em segundo plano também são contadas, pois alocam durante as
+    etapas das reruns: enquanto houver uma ativa, só ela própria pode medir.
+    """
     
-    def calcular_intervalo_confianca(self, sucessos, n_tentativas, confianca=0.95):
-        """Calcula intervalo de confiança usando método de Wilson."""
-        z = stats.norm.ppf((1 + confianca) / 2)
-        p = sucessos / n_tentativas
-        n = n_tentativas
-        
-        denominador = 1 + z**2 / n
-        centro = (p + z**2 / (2*n)) / denominador
-        margem = z * np.sqrt((p*(1-p) + z**2/(4*n)) / n) / denominador
-        
-        return (centro - margem, centro + margem)
+    def __init__(self):
+        self.trava = threading.Lock()
+        self._trava_contagem = threading.Lock()
+        self._ativas = 0
+        self._iniciadas = 0
+    
+    def registrar_execucao(self):
+        """Conta uma simulação em segundo plano que começou."""
+        with self._trava_contagem:
+            self._ativas += 1
+            self._iniciadas += 1
+    
+    def encerrar_execucao(self):
+        """Desconta uma simulação em segundo plano que terminou."""
+        with self._trava_contagem:
+            self._ativas -= 1
+    
+    def estado(self):
+        """Retorna (execuções ativas, execuções iniciadas desde a criação)."""
+        with self._trava_contagem:
+            return self._ativas, self._iniciadas
+
+@st.cache_resource
+def obter_rastreio_memoria():
+    """Instância única por processo: o script é reexecutado a cada rerun, o cache não."""
+    return RastreioMemoria()
+
+class CronometroEtapas:
+    """Registra duração (perf_counter) e, opcionalmente, pico de alocação de cada etapa.
+    
+    Se outra etapa já estiver medindo memória, ou se outra simulação em
+    segundo plano rodar durante a etapa, a alocação fica como None em vez
+    de misturar alocações alheias ao pico.
+    """
+    
+    def __init__(self, medir_memoria=False, rastreio=None, segundo_plano=False):
+        self.medir_memoria = medir_memoria and rastreio is not None
+        self.rastreio = rastreio
+        # A própria execução em segundo plano conta como ativa
+        self.execucoes_permitidas = 1 if segundo_plano else 0
+        self.registros = []
+    
+    @contextmanager
+    def etapa(self, nome):
+        """Mede o bloco with como a etapa nome."""
+        rastreio = self.rastreio
+        medir = (self.medir_memoria
+                 and rastreio.estado()[0] <= self.execucoes_permitidas
+                 and rastreio.trava.acquire(blocking=False))
+        iniciou_rastreio = medir and not tracemalloc.is_tracing()
+        if iniciou_rastreio:
+            tracemalloc.start()
+        if medir:
+            iniciadas = rastreio.estado()[1]
+            tracemalloc.reset_peak()
+            memoria_inicial = tracemalloc.get_traced_memory()[0]
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            registro = {'etapa': nome, 'tempo_s': time.perf_counter() - inicio, 'alocacao_pico_bytes': None}
+            if medir:
+                pico = tracemalloc.get_traced_memory()[1] - memoria_inicial
+                if iniciou_rastreio:
+                    tracemalloc.stop()
+                rastreio.trava.release()
+                ativas, iniciadas_final = rastreio.estado()
+                if ativas <= self.execucoes_permitidas and iniciadas_final == iniciadas:
+                    registro['alocacao_pico_bytes'] = pico
+            self.registros.append(registro)
+
+@st.cache_resource
+def obter_cache_simulacoes():
+    """Instância única do cache, compartilhada por todas as sessões do servidor."""
+    return CacheSimulacoes(diretorio=DIRETORIO_CACHE_DISCO or None)
 
 def main():
     # Título principal
@@ -113,60 +158,229 @@ def main():
     st.sidebar.header("⚙️ Configurações")
     
     # Parâmetros do jogo
-    min_numero = st.sidebar.slider("Número mínimo", 0, 19, 0)
-    max_numero = st.sidebar.slider("Número máximo", min_numero + 1, 20, 20)
+    min_numero = st.sidebar.slider("Número mínimo", 0, 19, 0, key='min_numero')
+    max_numero = st.sidebar.slider("Número máximo", min_numero + 1, 20, 20, key='max_numero')
     
     # Parâmetros da simulação
     n_simulacoes = st.sidebar.selectbox(
         "Número de simulações",
-        [1000, 5000, 10000, 50000, 100000, 500000, 1000000],
+        [1000, 5000, 10000, 50000, 100000, 500000, 1000000,
+         10_000_000, 100_000_000, 1_000_000_000],
         index=2
     )
     
+    modo = st.sidebar.radio(
+        "Modo de execução",
+        ['vetorizado', 'streaming', 'paralelo', 'paridade', 'compilado', 'estratificado', 'antitetico', 'hipercubo'],
+        format_func=lambda m: {'vetorizado': "Vetorizado (dados completos)",
+                               'streaming': "Streaming (memória constante)",
+                               'paralelo': "Paralelo (multiprocesso)",
+                               'paridade': "Somente paridade (mais rápido, sem somas)",
+                               'compilado': "Kernel compilado (Numba)" if numba_disponivel()
+                                            else "Kernel por contador (NumPy; instale numba para compilar)",
+                               'estratificado': "Estratificado pelo jogador 1",
+                               'antitetico': "Antitético (pares com paridade invertida)",
+                               'hipercubo': "Hipercubo latino"}[m],
+        help="Os três últimos modos reduzem a variância da estimativa de P(par); "
+             "o intervalo usa o tamanho efetivo de amostra correspondente"
+    )
+    n_processos = None
+    if modo in ('paralelo', 'paridade'):
+        n_processos = st.sidebar.number_input(
+            "Processos", min_value=1, max_value=os.cpu_count() or 1, value=os.cpu_count() or 1
+        )
+    if n_simulacoes > LIMITE_MODO_VETORIZADO and modo == 'vetorizado':
+        st.sidebar.caption(f"Acima de {LIMITE_MODO_VETORIZADO:,} simulações o modo streaming é usado automaticamente.")
+        modo = 'streaming'
+    
+    acompanhar_convergencia = st.sidebar.checkbox("📉 Acompanhar convergência")
+    tolerancia = None
+    if acompanhar_convergencia:
+        tolerancia = st.sidebar.number_input(
+            "Tolerância do IC (meia-largura)", min_value=0.0, max_value=0.1, value=0.0,
+            step=0.0005, format="%.4f",
+            help="Interrompe a simulação quando a meia-largura do intervalo fica abaixo deste valor (0 = sem parada antecipada)"
+        ) or None
+        if modo != 'streaming':
+            st.sidebar.caption("O acompanhamento de convergência usa o modo streaming.")
+            modo = 'streaming'
+    
     seed = st.sidebar.number_input("Seed (para reprodutibilidade)", min_value=0, value=42)
     confianca = st.sidebar.slider("Nível de confiança", 0.90, 0.99, 0.95, 0.01)
+    st.sidebar.checkbox(
+        "⏱️ Medir alocações por etapa", key='medir_memoria',
+        help="Usa tracemalloc no diagnóstico de desempenho; deixa a execução mais lenta, "
+             "não enxerga a memória dos processos auxiliares e deixa sem medição as etapas "
+             "que coincidem com outra simulação em segundo plano"
+    )
     
-    # Botão de simulação
-    if st.sidebar.button("🚀 Executar Simulação", type="primary"):
+    # Botão de simulação (desabilitado enquanto houver uma execução em segundo plano)
+    if st.sidebar.button("🚀 Executar Simulação", type="primary", disabled='execucao' in st.session_state):
         # Criar simulador
         simulador = SimuladorParOuImpar(min_numero, max_numero)
-        
-        # Progress bar
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-        
-        status_text.text("🔄 Executando simulação...")
-        progress_bar.progress(50)
-        
-        # Executar simulação
-        resultado = simulador.simular(n_simulacoes, seed)
-        
-        progress_bar.progress(100)
-        status_text.text("✅ Simulação concluída!")
-        
-        # Armazenar resultados no session_state
-        st.session_state.simulador = simulador
-        st.session_state.resultado = resultado
-        st.session_state.configuracao = {
+        configuracao = {
             'min_numero': min_numero,
             'max_numero': max_numero,
             'n_simulacoes': n_simulacoes,
-            'confianca': confianca
+            'confianca': confianca,
+            'modo': modo
         }
+        
+        # Reaproveitar resultado de configuração idêntica, desta ou de outra sessão
+        cache = obter_cache_simulacoes()
+        chave = cache.chave(min_numero, max_numero, n_simulacoes, seed, modo,
+                            (confianca, tolerancia) if acompanhar_convergencia else None)
+        resultado = cache.obter(chave)
+        
+        if resultado is None:
+            # Executar simulação numa thread; o progresso é acompanhado por acompanhar_execucao
+            parametros = {
+                'n_simulacoes': n_simulacoes, 'seed': seed, 'modo': modo, 'n_processos': n_processos,
+                'convergencia': acompanhar_convergencia, 'tolerancia': tolerancia, 'confianca': confianca
+            }
+            st.session_state.execucao = ExecucaoSimulacao(
+                simulador, parametros, chave, configuracao,
+                obter_rastreio_memoria(), st.session_state.get('medir_memoria', False)
+            )
+        else:
+            st.sidebar.success("✅ Resultado recuperado do cache!")
+            armazenar_resultado(simulador, resultado, configuracao, [])
+    
+    if 'erro_execucao' in st.session_state:
+        st.error(f"❌ A simulação falhou: {st.session_state.pop('erro_execucao')}")
+    
+    # Progresso da simulação em segundo plano
+    if 'execucao' in st.session_state:
+        acompanhar_execucao()
     
     # Exibir resultados se disponíveis
     if 'resultado' in st.session_state:
         exibir_resultados()
 
+class ExecucaoSegundoPlano:
+    """Tarefa rodando numa thread auxiliar, acompanhada pelo script por polling.
+    
+    tarefa é chamada com callback_progresso e cancelar. A thread não usa
+    comandos do Streamlit: apenas atualiza progresso, resultado e erro,
+    que um fragmento lê.
+    """
+    
+    def __init__(self, tarefa, rastreio, medir_memoria=False, nome_etapa='executar'):
+        self.progresso = 0.0
+        self.resultado = None
+        self.erro = None
+        self.cancelar = threading.Event()
+        self.rastreio = rastreio
+        self.nome_etapa = nome_etapa
+        self.cronometro = CronometroEtapas(medir_memoria, rastreio, segundo_plano=True)
+        self.inicio = time.perf_counter()
+        rastreio.registrar_execucao()
+        self._thread = threading.Thread(target=self._executar, args=(tarefa,), daemon=True)
+        self._thread.start()
+    
+    def _executar(self, tarefa):
+        try:
+            with self.cronometro.etapa(self.nome_etapa):
+                self.resultado = tarefa(callback_progresso=self._atualizar_progresso, cancelar=self.cancelar)
+        except Exception as erro:
+            self.erro = erro
+        finally:
+            self.rastreio.encerrar_execucao()
+    
+    def _atualizar_progresso(self, fracao):
+        self.progresso = fracao
+    
+    @property
+    def em_andamento(self):
+        """Indica se a thread ainda está executando."""
+        return self._thread.is_alive()
+    
+    @property
+    def cancelada(self):
+        """Indica se o cancelamento foi pedido."""
+        return self.cancelar.is_set()
+
+class ExecucaoSimulacao(ExecucaoSegundoPlano):
+    """Simulação em segundo plano, publicada por acompanhar_execucao ao terminar."""
+    
+    def __init__(self, simulador, parametros, chave, configuracao, rastreio, medir_memoria=False):
+        self.simulador = simulador
+        self.chave = chave
+        self.configuracao = configuracao
+        super().__init__(partial(simulador.simular, **parametros), rastreio, medir_memoria, 'simular')
+
+class ExecucaoReplicas(ExecucaoSegundoPlano):
+    """Réplicas do teste de aderência em segundo plano, resumidas por acompanhar_replicas ao terminar."""
+    
+    def __init__(self, simulador, parametros, alfa, rastreio):
+        self.intervalo = (simulador.min_numero, simulador.max_numero)
+        self.parametros = parametros
+        self.alfa = alfa
+        n_por_replica, n_replicas, seed, motor = parametros
+        super().__init__(
+            partial(simulador.replicar_aderencia, n_por_replica, n_replicas, seed=seed, modo=motor), rastreio
+        )
+
+@st.fragment(run_every=0.5)
+def acompanhar_execucao():
+    """Mostra o progresso da execução em segundo plano e publica o resultado ao terminar.
+    
+    Só este fragmento é reexecutado durante a simulação, então os demais
+    widgets continuam utilizáveis.
+    """
+    execucao = st.session_state.get('execucao')
+    if execucao is None:
+        return
+    
+    if execucao.em_andamento:
+        decorrido = time.perf_counter() - execucao.inicio
+        st.progress(min(execucao.progresso, 1.0),
+                    text=f"🔄 Executando simulação... {execucao.progresso*100:.0f}% ({decorrido:.1f}s)")
+        if execucao.cancelada:
+            st.caption("⏹️ Cancelando: aguardando o fim do bloco em andamento...")
+        elif st.button("⏹️ Cancelar simulação"):
+            execucao.cancelar.set()
+        return
+    
+    del st.session_state.execucao
+    if execucao.erro is not None:
+        st.session_state.erro_execucao = str(execucao.erro)
+    else:
+        resultado = execucao.resultado
+        configuracao = execucao.configuracao
+        # Resultados parciais de execuções canceladas não entram no cache
+        if execucao.cancelada and resultado.n_simulacoes < configuracao['n_simulacoes']:
+            configuracao['n_solicitadas'] = configuracao['n_simulacoes']
+        else:
+            obter_cache_simulacoes().guardar(execucao.chave, resultado)
+        armazenar_resultado(execucao.simulador, resultado, configuracao, execucao.cronometro.registros)
+    st.rerun()
+
+def armazenar_resultado(simulador, resultado, configuracao, etapas):
+    """Guarda o resultado exibido por exibir_resultados no session_state."""
+    st.session_state.etapas_simulacao = etapas
+    st.session_state.simulador = simulador
+    st.session_state.resultado = resultado
+    # Com parada antecipada ou cancelamento o número executado pode ser menor que o pedido
+    st.session_state.configuracao = {**configuracao, 'n_simulacoes': resultado.n_simulacoes}
+
 def exibir_resultados():
     """Exibe todos os resultados da simulação."""
     simulador = st.session_state.simulador
     resultado = st.session_state.resultado
     config = st.session_state.configuracao
+    cronometro = CronometroEtapas(st.session_state.get('medir_memoria', False), obter_rastreio_memoria())
+    inicio_exibicao = time.perf_counter()
     
     # Métricas principais
     st.header("📊 Resultados da Simulação")
     
+    if 'n_solicitadas' in config:
+        st.warning(
+            f"⏹️ Simulação cancelada: resultados parciais com {config['n_simulacoes']:,} "
+            f"de {config['n_solicitadas']:,} simulações."
+        )
+    
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
@@ -180,21 +394,21 @@ def exibir_resultados():
         st.metric(
             "🔢 Simulações",
             f"{config['n_simulacoes']:,}",
-            f"{resultado['tempo_execucao']:.3f}s"
+            f"{resultado.tempo_execucao:.3f}s"
         )
     
     with col3:
         st.metric(
             "🟦 Vitórias Par",
-            f"{resultado['vitorias_par']:,}",
-            f"{resultado['prob_par_obs']*100:.2f}%"
+            f"{resultado.vitorias_par:,}",
+            f"{resultado.prob_par_obs*100:.2f}%"
         )
     
     with col4:
         st.metric(
             "🟧 Vitórias Ímpar",
-            f"{resultado['vitorias_impar']:,}",
-            f"{resultado['prob_impar_obs']*100:.2f}%"
+            f"{resultado.vitorias_impar:,}",
+            f"{resultado.prob_impar_obs*100:.2f}%"
         )
     
     # Análise teórica vs observada
@@ -206,8 +420,8 @@ def exibir_resultados():
         st.subheader("📈 Probabilidades Observadas")
         df_obs = pd.DataFrame({
             'Resultado': ['Par', 'Ímpar'],
-            'Probabilidade': [resultado['prob_par_obs'], resultado['prob_impar_obs']],
-            'Vitórias': [resultado['vitorias_par'], resultado['vitorias_impar']]
+            'Probabilidade': [resultado.prob_par_obs, resultado.prob_impar_obs],
+            'Vitórias': [resultado.vitorias_par, resultado.vitorias_impar]
         })
         st.dataframe(df_obs, use_container_width=True)
     
@@ -226,16 +440,13 @@ def exibir_resultados():
     # Análise estatística
     st.header("📊 Análise Estatística")
     
-    ic_par = simulador.calcular_intervalo_confianca(
-        resultado['vitorias_par'], 
-        config['n_simulacoes'], 
-        config['confianca']
-    )
+    with cronometro.etapa('calcular_intervalo_confianca'):
+        ic_par = simulador.intervalo_resultado(resultado, config['confianca'])
     
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        diferenca_par = abs(resultado['prob_par_obs'] - simulador.prob_teorica_par)
+        diferenca_par = abs(resultado.prob_par_obs - simulador.prob_teorica_par)
         st.markdown(f"""
         <div class="metric-card">
             <h4>📐 Diferença Absoluta (Par)</h4>
@@ -262,14 +473,152 @@ def exibir_resultados():
         </div>
         """, unsafe_allow_html=True)
     
+    if resultado.estimativa_ajustada is not None:
+        estimativa = resultado.estimativa_ajustada
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("🎯 Tamanho efetivo de amostra", f"{estimativa['n_efetivo']:,.0f}",
+                      f"{config['n_simulacoes']:,} executadas", delta_color="off")
+        with col2:
+            st.metric("🚀 Ganho sobre amostragem simples", f"{estimativa['ganho']:.2f}×")
+        with col3:
+            st.metric("📏 Erro padrão da estimativa", f"{np.sqrt(estimativa['variancia'])*100:.4f}%")
+        st.caption(
+            "O intervalo acima usa o tamanho efetivo de amostra: equivale ao de uma simulação "
+            "simples com esse número de jogadas."
+        )
+    
+    criar_distribuicao_amostral(simulador, config)
+    
+    # Convergência da estimativa
+    if resultado.convergencia is not None:
+        criar_grafico_convergencia(simulador, resultado)
+    
     # Visualizações
-    criar_visualizacoes(simulador, resultado, config)
+    with cronometro.etapa('criar_visualizacoes'):
+        criar_visualizacoes(simulador, resultado, config)
     
     # Análise de distribuição das somas
-    criar_analise_distribuicao(resultado)
+    if resultado.tem_somas:
+        with cronometro.etapa('criar_analise_distribuicao'):
+            criar_analise_distribuicao(simulador, resultado, config)
+    else:
+        st.info("ℹ️ O modo somente paridade não registra as somas; a análise da distribuição não está disponível.")
     
     # Download dos dados
-    criar_secao_download(simulador, resultado, config)
+    with cronometro.etapa('criar_secao_download'):
+        criar_secao_download(simulador, resultado, config)
+    
+    # Diagnóstico: a simulação vem da execução do botão, as demais etapas deste rerun
+    registros = st.session_state.get('etapas_simulacao', []) + cronometro.registros
+    criar_painel_diagnostico(registros, time.perf_counter() - inicio_exibicao)
+
+def criar_painel_diagnostico(registros, tempo_exibicao):
+    """Mostra a duração e a alocação de cada etapa, com exportação em JSON."""
+    with st.expander("⏱️ Diagnóstico de desempenho"):
+        if not any(registro['etapa'] == 'simular' for registro in registros):
+            st.caption("A simulação foi recuperada do cache, por isso a etapa simular não aparece.")
+        
+        df_etapas = pd.DataFrame(registros)
+        df_etapas['Alocação (MB)'] = df_etapas.pop('alocacao_pico_bytes').astype(float) / 1e6
+        df_etapas = df_etapas.rename(columns={'etapa': 'Etapa', 'tempo_s': 'Tempo (s)'})
+        st.dataframe(df_etapas, use_container_width=True)
+        st.caption(f"Exibição completa dos resultados neste rerun: {tempo_exibicao:.3f}s")
+        
+        diagnostico = {'etapas': registros, 'tempo_exibicao_s': tempo_exibicao}
+        st.download_button(
+            label="📥 Baixar diagnóstico (JSON)",
+            data=json.dumps(diagnostico, indent=2, ensure_ascii=False),
+            file_name="diagnostico_desempenho.json",
+            mime="application/json"
+        )
+
+def criar_distribuicao_amostral(simulador, config):
+    """Distribuição amostral de P(par) observada e cobertura do IC pelo atalho binomial."""
+    with st.expander("📐 Distribuição amostral de P(par) (atalho binomial)"):
+        st.markdown("""
+        As vitórias de par de uma simulação seguem exatamente uma Binomial(n, P(par) teórica).
+        Cada réplica é sorteada diretamente dessa binomial, sem rodar o simulador, e recebe
+        seu intervalo de Wilson; a cobertura é a fração de intervalos que contém o valor teórico.
+        """)
+        n_replicas = st.selectbox("Réplicas", [10_000, 100_000, 1_000_000], index=1, key='replicas_binomiais')
+        
+        if st.button("📐 Sortear Réplicas"):
+            n_simulacoes = config['n_simulacoes']
+            df_replicas = simulador.replicar_binomial(n_simulacoes, n_replicas, confianca=config['confianca'])
+            st.session_state.distribuicao_amostral = (
+                (simulador.min_numero, simulador.max_numero, n_simulacoes),
+                simulador.resumir_replicas_binomiais(df_replicas, n_simulacoes, config['confianca']),
+                np.histogram(df_replicas['prob_par_obs'], bins=60)
+            )
+        
+        chave, resumo, (contagens, bordas) = st.session_state.get('distribuicao_amostral', (None, None, (None, None)))
+        if chave != (simulador.min_numero, simulador.max_numero, config['n_simulacoes']):
+            return
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Desvio padrão observado", f"{resumo['desvio_prob_obs']:.6f}",
+                      f"teórico {resumo['desvio_teorico']:.6f}", delta_color="off")
+        with col2:
+            st.metric(f"Cobertura do IC ({resumo['confianca_nominal']*100:.0f}% nominal)",
+                      f"{resumo['cobertura']*100:.2f}%",
+                      f"[{resumo['cobertura_ic_inferior']*100:.2f}%, {resumo['cobertura_ic_superior']*100:.2f}%]",
+                      delta_color="off")
+        with col3:
+            st.metric("Largura média do IC", f"{resumo['largura_media_ic']*100:.3f}%")
+        
+        centros = (bordas[:-1] + bordas[1:]) / 2
+        fig_amostral = go.Figure(go.Bar(x=centros, y=contagens, name='Réplicas', marker_color='#1f77b4'))
+        # Aproximação normal da binomial, na mesma escala do histograma
+        p, n = simulador.prob_teorica_par, config['n_simulacoes']
+        desvio = np.sqrt(p * (1 - p) / n)
+        densidade = np.exp(-0.5 * ((centros - p) / desvio) ** 2) / (desvio * np.sqrt(2 * np.pi))
+        fig_amostral.add_trace(go.Scatter(
+            x=centros, y=densidade * resumo['replicas'] * (bordas[1] - bordas[0]),
+            mode='lines', name='Normal teórica', line=dict(color='#ff7f0e')
+        ))
+        fig_amostral.update_layout(title=f"P(par) observada em {resumo['replicas']:,} réplicas",
+                                   xaxis_title="P(par) observada", yaxis_title="Réplicas")
+        st.plotly_chart(fig_amostral, use_container_width=True)
+
+def criar_grafico_convergencia(simulador, resultado):
+    """Mostra a evolução de P(par) e do intervalo de Wilson ao longo da simulação."""
+    st.header("📉 Convergência da Estimativa")
+    
+    historico = resultado.convergencia
+    if historico['parada_antecipada']:
+        st.success(
+            f"Parada antecipada após {resultado.n_simulacoes:,} de {historico['n_maximo']:,} simulações: "
+            f"meia-largura do IC ≤ {historico['tolerancia']:.4f}"
+        )
+    
+    fig_conv = go.Figure()
+    fig_conv.add_trace(go.Scatter(
+        x=np.concatenate([historico['n'], historico['n'][::-1]]),
+        y=np.concatenate([historico['ic_superior'], historico['ic_inferior'][::-1]]),
+        fill='toself',
+        fillcolor='rgba(31, 119, 180, 0.2)',
+        line=dict(width=0),
+        name=f"IC {historico['confianca']*100:.0f}% (Wilson)"
+    ))
+    fig_conv.add_trace(go.Scatter(
+        x=historico['n'],
+        y=historico['prob_par'],
+        mode='lines',
+        name='P(par) observada',
+        line=dict(color='#1f77b4')
+    ))
+    fig_conv.add_hline(y=simulador.prob_teorica_par, line_dash="dash", line_color="#ff7f0e",
+                       annotation_text="Teórico")
+    fig_conv.update_layout(
+        title='Convergência de P(par)',
+        xaxis_title='Simulações',
+        yaxis_title='Probabilidade',
+        xaxis_type='log',
+        yaxis_tickformat='.1%'
+    )
+    st.plotly_chart(fig_conv, use_container_width=True)
 
 def criar_visualizacoes(simulador, resultado, config):
     """Cria visualizações interativas."""
@@ -280,11 +629,11 @@ def criar_visualizacoes(simulador, resultado, config):
         'Tipo': ['Observado', 'Observado', 'Teórico', 'Teórico'],
         'Resultado': ['Par', 'Ímpar', 'Par', 'Ímpar'],
         'Probabilidade': [
-            resultado['prob_par_obs'], resultado['prob_impar_obs'],
+            resultado.prob_par_obs, resultado.prob_impar_obs,
             simulador.prob_teorica_par, simulador.prob_teorica_impar
         ],
         'Vitórias': [
-            resultado['vitorias_par'], resultado['vitorias_impar'],
+            resultado.vitorias_par, resultado.vitorias_impar,
             simulador.prob_teorica_par * config['n_simulacoes'],
             simulador.prob_teorica_impar * config['n_simulacoes']
         ]
@@ -318,21 +667,36 @@ def criar_visualizacoes(simulador, resultado, config):
         )
         st.plotly_chart(fig_pizza, use_container_width=True)
 
-def criar_analise_distribuicao(resultado):
+def criar_analise_distribuicao(simulador, resultado, config):
     """Cria análise da distribuição das somas."""
     st.header("🔍 Análise da Distribuição das Somas")
     
-    # Histograma das somas
-    fig_hist = px.histogram(
-        x=resultado['somas'],
-        nbins=50,
+    tabela = resultado.tabela_frequencias()
+    estatisticas = resultado.estatisticas_somas()
+    somas_teoricas, probs_teoricas = simulador.distribuicao_somas_teorica()
+    
+    # Gráfico montado a partir da tabela de frequências (uma barra por valor de soma)
+    fig_hist = px.bar(
+        tabela,
+        x='Soma',
+        y='Frequência',
         title='Distribuição das Somas',
-        labels={'x': 'Soma', 'y': 'Frequência'},
         color_discrete_sequence=['#1f77b4']
     )
+    fig_hist.update_traces(name='Observado', showlegend=True)
+    
+    # Frequências esperadas pela distribuição teórica exata
+    fig_hist.add_trace(go.Scatter(
+        x=somas_teoricas,
+        y=probs_teoricas * config['n_simulacoes'],
+        mode='lines+markers',
+        name='Teórico',
+        line=dict(color='#ff7f0e')
+    ))
+    
+    media_somas = estatisticas['media']
     
     # Adicionar linha vertical para média
-    media_somas = np.mean(resultado['somas'])
     fig_hist.add_vline(x=media_somas, line_dash="dash", line_color="red", 
                        annotation_text=f"Média: {media_somas:.1f}")
     
@@ -342,13 +706,150 @@ def criar_analise_distribuicao(resultado):
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("📊 Média", f"{np.mean(resultado['somas']):.2f}")
+        st.metric("📊 Média", f"{media_somas:.2f}")
     with col2:
-        st.metric("📏 Mediana", f"{np.median(resultado['somas']):.1f}")
+        st.metric("📏 Mediana", f"{estatisticas['mediana']:.1f}")
     with col3:
-        st.metric("📈 Desvio Padrão", f"{np.std(resultado['somas']):.2f}")
+        st.metric("📈 Desvio Padrão", f"{estatisticas['desvio_padrao']:.2f}")
     with col4:
-        st.metric("🎯 Moda", f"{stats.mode(resultado['somas'])[0]:.0f}")
+        st.metric("🎯 Moda", f"{estatisticas['moda']:.0f}")
+    
+    criar_teste_aderencia(simulador, resultado, config)
+
+def criar_teste_aderencia(simulador, resultado, config):
+    """Testes qui-quadrado e G do histograma das somas, com modo de réplicas."""
+    st.subheader("🧪 Teste de Aderência à Distribuição Exata")
+    
+    teste = simulador.testar_aderencia(resultado)
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("χ² de Pearson", f"{teste['qui_quadrado']:.2f}", f"p = {teste['p_qui_quadrado']:.4f}",
+                  delta_color="off")
+    with col2:
+        st.metric("Teste G", f"{teste['g']:.2f}", f"p = {teste['p_g']:.4f}", delta_color="off")
+    with col3:
+        st.metric("Graus de liberdade", teste['graus_liberdade'],
+                  f"{teste['classes_agrupadas']} de {teste['classes']} classes", delta_color="off")
+    if teste['classes_agrupadas'] < teste['classes']:
+        st.caption("Classes com frequência esperada abaixo de 5 foram agrupadas com as vizinhas.")
+    
+    with st.expander("🔁 Réplicas: distribuição dos p-valores"):
+        st.markdown("""
+        Repete a simulação com seeds independentes e aplica os testes a cada réplica.
+        Se o gerador estiver correto, os p-valores são aproximadamente uniformes em [0, 1]
+        e a taxa de rejeição fica próxima do nível de significância.
+        """)
+        motor = st.radio(
+            "Origem das réplicas",
+            ['paralelo', 'multinomial'],
+            format_func=lambda m: {'paralelo': "Simulador (testa o gerador)",
+                                   'multinomial': "Multinomial exata (testa a calibração do teste, O(classes) por réplica)"}[m],
+            horizontal=True
+        )
+        col1, col2 = st.columns(2)
+        with col1:
+            n_replicas = st.number_input(
+                "Réplicas", min_value=10, max_value=2000 if motor == 'paralelo' else 1_000_000,
+                value=100, step=10
+            )
+        with col2:
+            n_por_replica = st.selectbox(
+                "Simulações por réplica",
+                [1000, 10000, 100000, 1000000, 10_000_000],
+                index=2
+            )
+        
+        if 'erro_replicas' in st.session_state:
+            st.error(f"❌ As réplicas falharam: {st.session_state.pop('erro_replicas')}")
+        if 'aviso_replicas' in st.session_state:
+            st.warning(st.session_state.pop('aviso_replicas'))
+        
+        # Réplicas rodam em segundo plano: com milhões de simulações por réplica levam minutos
+        execucao = st.session_state.get('execucao_replicas')
+        if st.button("🔁 Executar Réplicas", disabled=execucao is not None) and execucao is None:
+            st.session_state.execucao_replicas = ExecucaoReplicas(
+                simulador, (n_por_replica, n_replicas, resultado.seed, motor), 1 - config['confianca'],
+                obter_rastreio_memoria()
+            )
+        if 'execucao_replicas' in st.session_state:
+            acompanhar_replicas()
+        
+        # Réplicas de outro intervalo não se aplicam à simulação exibida
+        replicas = st.session_state.get('replicas_aderencia')
+        if replicas is not None and replicas['intervalo'] == (simulador.min_numero, simulador.max_numero):
+            alfa = replicas['alfa']
+            resumo_qui, resumo_g = replicas['resumo_qui'], replicas['resumo_g']
+            
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric(f"Rejeições χ² (α = {alfa:.2f})", f"{resumo_qui['taxa_rejeicao']*100:.1f}%")
+            with col2:
+                st.metric(f"Rejeições G (α = {alfa:.2f})", f"{resumo_g['taxa_rejeicao']*100:.1f}%")
+            with col3:
+                st.metric("KS p-valores ~ U(0,1)", f"p = {resumo_qui['p_uniformidade']:.4f}")
+            
+            # Histograma calculado no servidor: com milhões de réplicas não se envia cada ponto ao navegador
+            if replicas['n_replicas'] < replicas['n_solicitadas']:
+                st.warning(f"⏹️ Réplicas canceladas: {replicas['n_replicas']:,} de "
+                           f"{replicas['n_solicitadas']:,} concluídas.")
+            contagens, bordas = replicas['histograma']
+            fig_pvalores = px.bar(
+                x=(bordas[:-1] + bordas[1:]) / 2, y=contagens,
+                title=f"P-valores do χ² em {replicas['n_replicas']:,} réplicas",
+                labels={'x': 'p-valor', 'y': 'Réplicas'}
+            )
+            fig_pvalores.update_traces(width=0.05)
+            st.plotly_chart(fig_pvalores, use_container_width=True)
+            st.download_button(
+                label="📥 Baixar réplicas (CSV)",
+                data=partial(csv_replicas_aderencia, simulador, *replicas['parametros']),
+                file_name="replicas_aderencia.csv",
+                mime="text/csv"
+            )
+
+@st.fragment(run_every=0.5)
+def acompanhar_replicas():
+    """Mostra o progresso das réplicas em segundo plano e guarda o resumo ao terminar."""
+    execucao = st.session_state.get('execucao_replicas')
+    if execucao is None:
+        return
+    
+    if execucao.em_andamento:
+        decorrido = time.perf_counter() - execucao.inicio
+        st.progress(min(execucao.progresso, 1.0),
+                    text=f"🔁 Executando réplicas... {execucao.progresso*100:.0f}% ({decorrido:.1f}s)")
+        if execucao.cancelada:
+            st.caption("⏹️ Cancelando: aguardando o fim da réplica em andamento...")
+        elif st.button("⏹️ Cancelar réplicas"):
+            execucao.cancelar.set()
+        return
+    
+    del st.session_state.execucao_replicas
+    df_replicas = execucao.resultado
+    if execucao.erro is not None:
+        st.session_state.erro_replicas = str(execucao.erro)
+    elif len(df_replicas) == 0:
+        st.session_state.aviso_replicas = "⏹️ Réplicas canceladas antes de concluir a primeira."
+    else:
+        n_por_replica, n_solicitadas, seed, motor = execucao.parametros
+        alfa = execucao.alfa
+        # Só resumos e histograma ficam na sessão; o CSV é regenerado pela seed no download.
+        # As réplicas concluídas são as primeiras da seed, então o CSV usa só a quantidade concluída.
+        st.session_state.replicas_aderencia = {
+            'intervalo': execucao.intervalo,
+            'parametros': (n_por_replica, len(df_replicas), seed, motor),
+            'n_replicas': len(df_replicas),
+            'n_solicitadas': n_solicitadas,
+            'alfa': alfa,
+            'resumo_qui': resumir_pvalores(df_replicas['p_qui_quadrado'], alfa),
+            'resumo_g': resumir_pvalores(df_replicas['p_g'], alfa),
+            'histograma': np.histogram(df_replicas['p_qui_quadrado'], bins=20, range=(0, 1))
+        }
+    st.rerun()
+
+def csv_replicas_aderencia(simulador, n_por_replica, n_replicas, seed, motor):
+    """CSV das réplicas, regenerado pela seed apenas quando o download é pedido."""
+    return simulador.replicar_aderencia(n_por_replica, n_replicas, seed=seed, modo=motor).to_csv(index=False)
 
 def criar_secao_download(simulador, resultado, config):
     """Cria seção de download dos dados."""
@@ -357,33 +858,36 @@ def criar_secao_download(simulador, resultado, config):
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        # DataFrame dos resultados detalhados
-        df_detalhado = pd.DataFrame({
-            'Jogador_1': resultado['numeros_j1'],
-            'Jogador_2': resultado['numeros_j2'],
-            'Soma': resultado['somas'],
-            'Resultado': ['Par' if s % 2 == 0 else 'Ímpar' for s in resultado['somas']]
-        })
-        
-        csv_detalhado = df_detalhado.to_csv(index=False)
-        st.download_button(
-            label="📊 Dados Detalhados (CSV)",
-            data=csv_detalhado,
-            file_name=f"simulacao_detalhada_{config['n_simulacoes']}.csv",
-            mime="text/csv"
-        )
+        if resultado.regeneravel:
+            # Dados detalhados: o arquivo só é gerado quando o download é pedido
+            formato = st.selectbox(
+                "Formato dos dados detalhados",
+                formatos_exportacao_disponiveis(),
+                format_func=lambda f: FORMATOS_EXPORTACAO[f][0]
+            )
+            _, extensao, mime = FORMATOS_EXPORTACAO[formato]
+            st.download_button(
+                label="📊 Dados Detalhados",
+                data=partial(dados_detalhados_bytes, resultado, formato),
+                file_name=f"simulacao_detalhada_{config['n_simulacoes']}.{extensao}",
+                mime=mime
+            )
+        else:
+            st.info("Dados detalhados só podem ser regenerados no modo vetorizado.")
     
     with col2:
         # Resumo estatístico
         resumo = {
             'Configuração': f"[{config['min_numero']}-{config['max_numero']}]",
             'Simulações': config['n_simulacoes'],
-            'Prob_Par_Observada': resultado['prob_par_obs'],
+            'Prob_Par_Observada': resultado.prob_par_obs,
             'Prob_Par_Teórica': simulador.prob_teorica_par,
-            'Prob_Ímpar_Observada': resultado['prob_impar_obs'],
+            'Prob_Ímpar_Observada': resultado.prob_impar_obs,
             'Prob_Ímpar_Teórica': simulador.prob_teorica_impar,
-            'Tempo_Execução': resultado['tempo_execucao']
+            'Tempo_Execução': resultado.tempo_execucao
         }
+        if resultado.estimativa_ajustada is not None:
+            resumo['Tamanho_Efetivo'] = resultado.estimativa_ajustada['n_efetivo']
         
         df_resumo = pd.DataFrame([resumo])
         csv_resumo = df_resumo.to_csv(index=False)
@@ -395,14 +899,16 @@ def criar_secao_download(simulador, resultado, config):
         )
     
     with col3:
-        # Análise de frequência das somas
-        valores_unicos, contagens = np.unique(resultado['somas'], return_counts=True)
-        df_freq = pd.DataFrame({
-            'Soma': valores_unicos,
-            'Frequência': contagens,
-            'Probabilidade': contagens / len(resultado['somas']),
-            'Tipo': ['Par' if s % 2 == 0 else 'Ímpar' for s in valores_unicos]
-        })
+        if not resultado.tem_somas:
+            st.info("Frequência das somas indisponível no modo somente paridade.")
+            return
+        
+        # Análise de frequência das somas (somas observadas ao menos uma vez)
+        _, probs_teoricas = simulador.distribuicao_somas_teorica()
+        df_freq = resultado.tabela_frequencias().assign(Probabilidade_Teórica=probs_teoricas)
+        df_freq = df_freq[df_freq['Frequência'] > 0][
+            ['Soma', 'Frequência', 'Probabilidade', 'Probabilidade_Teórica', 'Tipo']
+        ]
         
         csv_freq = df_freq.to_csv(index=False)
         st.download_button(
@@ -412,6 +918,234 @@ def criar_secao_download(simulador, resultado, config):
             mime="text/csv"
         )
 
+def criar_secao_estrategias():
+    """Cria seção de estratégias não uniformes e jogos com mais de dois jogadores."""
+    st.header("👥 Estratégias e Múltiplos Jogadores")
+    
+    min_numero = st.session_state.get('min_numero', 0)
+    max_numero = st.session_state.get('max_numero', 20)
+    st.caption(f"Intervalo da barra lateral: [{min_numero}-{max_numero}]")
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        n_jogadores = st.slider("Número de jogadores", 2, 10, 2)
+    with col2:
+        n_simulacoes = st.selectbox("Simulações", [10000, 100000, 1000000], index=1, key='n_simulacoes_estrategias')
+    with col3:
+        seed = st.number_input("Seed", min_value=0, value=42, key='seed_estrategias')
+    
+    colunas = st.columns(min(n_jogadores, 5))
+    estrategias = []
+    for jogador in range(n_jogadores):
+        with colunas[jogador % len(colunas)]:
+            estrategias.append(st.selectbox(
+                f"Jogador {jogador + 1}",
+                list(ESTRATEGIAS),
+                format_func=ESTRATEGIAS.get,
+                key=f'estrategia_jogador_{jogador}'
+            ))
+    
+    if st.button("👥 Simular Estratégias"):
+        simulador = SimuladorMultijogador(
+            min_numero, max_numero,
+            [vetor_estrategia(estrategia, min_numero, max_numero) for estrategia in estrategias]
+        )
+        with st.spinner("Simulando..."):
+            st.session_state.estrategias = (simulador, simulador.simular(n_simulacoes, seed))
+    
+    if 'estrategias' not in st.session_state:
+        return
+    
+    simulador, resultado = st.session_state.estrategias
+    ic_par = simulador.calcular_intervalo_confianca(resultado.vitorias_par, resultado.n_simulacoes)
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("🎯 P(par) Teórica", f"{simulador.prob_teorica_par*100:.3f}%")
+    with col2:
+        st.metric("📈 P(par) Observada", f"{resultado.prob_par_obs*100:.3f}%", f"{resultado.tempo_execucao:.3f}s")
+    with col3:
+        st.metric("📏 IC 95% (Wilson)", f"[{ic_par[0]*100:.2f}%, {ic_par[1]*100:.2f}%]")
+    
+    somas_teoricas, probs_teoricas = simulador.distribuicao_somas_teorica()
+    fig_somas = px.bar(
+        resultado.tabela_frequencias(),
+        x='Soma',
+        y='Probabilidade',
+        title=f'Distribuição das Somas ({simulador.n_jogadores} jogadores)',
+        color_discrete_sequence=['#1f77b4']
+    )
+    fig_somas.update_traces(name='Observado', showlegend=True)
+    fig_somas.add_trace(go.Scatter(
+        x=somas_teoricas,
+        y=probs_teoricas,
+        mode='lines',
+        name='Teórico',
+        line=dict(color='#ff7f0e')
+    ))
+    st.plotly_chart(fig_somas, use_container_width=True)
+
+def criar_secao_varredura():
+    """Cria seção de varredura do viés em todos os intervalos [min, max]."""
+    st.header("🗺️ Varredura de Intervalos")
+    st.markdown("Viés de P(par) em todas as combinações de número mínimo e máximo, calculado de uma só vez.")
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        n_por_configuracao = st.selectbox(
+            "Simulações por configuração (0 = só teórico)",
+            [0, 1000, 10000, 100000],
+            index=2
+        )
+    with col2:
+        seed_varredura = st.number_input("Seed da varredura", min_value=0, value=42)
+    with col3:
+        confianca_varredura = st.slider("Confiança da varredura", 0.90, 0.99, 0.95, 0.01)
+    
+    if st.button("🗺️ Executar Varredura"):
+        with st.spinner("Avaliando todas as configurações..."):
+            inicio = time.time()
+            st.session_state.varredura = varrer_intervalos(
+                0, 20, n_por_configuracao, seed_varredura, confianca_varredura
+            )
+            st.session_state.tempo_varredura = time.time() - inicio
+    
+    if 'varredura' not in st.session_state:
+        return
+    
+    df_varredura = st.session_state.varredura
+    tem_monte_carlo = 'prob_par_obs' in df_varredura
+    st.caption(f"{len(df_varredura)} configurações avaliadas em {st.session_state.tempo_varredura:.3f}s")
+    
+    colunas_vies = [('vies_teorico', 'Viés Teórico')]
+    if tem_monte_carlo:
+        colunas_vies.append(('vies_observado', 'Viés Observado (Monte Carlo)'))
+    
+    for coluna_mapa, (coluna, titulo) in zip(st.columns(len(colunas_vies)), colunas_vies):
+        with coluna_mapa:
+            matriz = df_varredura.pivot(index='min_numero', columns='max_numero', values=coluna) * 100
+            fig_mapa = go.Figure(go.Heatmap(
+                z=matriz.values,
+                x=matriz.columns,
+                y=matriz.index,
+                colorscale='RdBu',
+                zmid=0,
+                colorbar=dict(title='Viés (p.p.)'),
+                hovertemplate='min=%{y} max=%{x}<br>Viés: %{z:.3f} p.p.<extra></extra>'
+            ))
+            fig_mapa.update_layout(title=titulo, xaxis_title='Número máximo', yaxis_title='Número mínimo')
+            st.plotly_chart(fig_mapa, use_container_width=True)
+    
+    if tem_monte_carlo:
+        fora_do_ic = df_varredura[~df_varredura['teorico_no_ic']]
+        st.metric(
+            "🎯 Configurações com valor teórico dentro do IC",
+            f"{df_varredura['teorico_no_ic'].sum()} / {len(df_varredura)}"
+        )
+        if not fora_do_ic.empty:
+            st.dataframe(fora_do_ic, use_container_width=True)
+
+def criar_secao_banca():
+    """Cria seção de simulação de bancas em partidas sucessivas."""
+    st.header("💰 Banca em Jogos Sucessivos")
+    st.markdown("Evolução da banca de muitos jogadores apostando partida após partida, até a ruína ou o fim do horizonte.")
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        n_trajetorias = st.selectbox("Jogadores (trajetórias)", [1000, 10000, 100000], index=1)
+        n_jogos = st.selectbox("Partidas por jogador", [100, 1000, 10000], index=1)
+    with col2:
+        banca_inicial = st.number_input("Banca inicial", min_value=1, value=100)
+        aposta = st.number_input("Aposta por partida", min_value=1, value=1)
+    with col3:
+        limite_ruina = st.number_input("Limite de ruína", min_value=0, value=0)
+        aposta_em = st.radio("Apostar em", ['par', 'impar'], format_func=str.capitalize, horizontal=True)
+    with col4:
+        intervalo_banca = st.slider("Intervalo dos números", 0, 20, (0, 20), key='intervalo_banca')
+        seed_banca = st.number_input("Seed da banca", min_value=0, value=42)
+    
+    if st.button("💰 Simular Bancas"):
+        if banca_inicial <= limite_ruina:
+            st.error("A banca inicial deve ser maior que o limite de ruína.")
+        else:
+            simulador = SimuladorParOuImpar(*intervalo_banca)
+            barra = st.progress(0.0)
+            st.session_state.banca = simulador.simular_banca(
+                n_trajetorias, n_jogos, banca_inicial, aposta, limite_ruina, aposta_em, seed_banca,
+                callback_progresso=barra.progress
+            )
+            barra.empty()
+    
+    if 'banca' not in st.session_state:
+        return
+    
+    banca = st.session_state.banca
+    st.caption(f"{banca.n_trajetorias:,} trajetórias × {banca.n_jogos:,} partidas em {banca.tempo_execucao:.3f}s")
+    
+    ic_inferior, ic_superior = intervalo_wilson(banca.ruinas, banca.n_trajetorias)
+    tempos = banca.tempos_ruina[banca.tempos_ruina >= 0]
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("☠️ Probabilidade de Ruína", f"{banca.prob_ruina:.4%}",
+                  help=f"IC 95% (Wilson): [{ic_inferior:.4%}, {ic_superior:.4%}]")
+    with col2:
+        st.metric("⏱️ Mediana até a Ruína", f"{np.median(tempos):,.0f} partidas" if len(tempos) else "—")
+    with col3:
+        st.metric("📉 Drawdown Máximo Mediano", f"{np.median(banca.drawdowns_maximos):,.0f}")
+    with col4:
+        st.metric("🏁 Banca Final Média", f"{banca.bancas_finais.mean():,.2f}")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        fig_bandas = go.Figure()
+        cores = px.colors.sequential.Blues[2:]
+        n_faixas = len(banca.percentis) // 2
+        # Faixas simétricas preenchidas entre percentis opostos (ex.: 5-95, 25-75)
+        for i in range(n_faixas):
+            inferior, superior = banca.percentis[i], banca.percentis[-1 - i]
+            fig_bandas.add_trace(go.Scatter(
+                x=banca.pontos, y=banca.bandas[-1 - i], mode='lines', line=dict(width=0),
+                showlegend=False, hoverinfo='skip'
+            ))
+            fig_bandas.add_trace(go.Scatter(
+                x=banca.pontos, y=banca.bandas[i], mode='lines', line=dict(width=0),
+                fill='tonexty', fillcolor=cores[2 * i % len(cores)], opacity=0.5,
+                name=f"P{inferior}–P{superior}"
+            ))
+        if len(banca.percentis) % 2:
+            fig_bandas.add_trace(go.Scatter(
+                x=banca.pontos, y=banca.bandas[n_faixas], mode='lines',
+                line=dict(color='navy'), name=f"P{banca.percentis[n_faixas]}"
+            ))
+        fig_bandas.add_hline(y=banca.limite_ruina, line_dash="dash", line_color="red",
+                             annotation_text="Ruína")
+        fig_bandas.update_layout(title="Faixas de Percentis da Banca", xaxis_title="Partida",
+                                 yaxis_title="Banca")
+        st.plotly_chart(fig_bandas, use_container_width=True)
+    
+    with col2:
+        curva = banca.curva_ruina()
+        fig_ruina = go.Figure(go.Scatter(
+            x=banca.pontos, y=curva[banca.pontos - 1], mode='lines', line=dict(color='red')
+        ))
+        fig_ruina.update_layout(title="Probabilidade Acumulada de Ruína", xaxis_title="Partida",
+                                yaxis_title="P(ruína até a partida)", yaxis_tickformat='.1%')
+        st.plotly_chart(fig_ruina, use_container_width=True)
+    
+    # Histograma calculado aqui: só as contagens vão para o navegador
+    valores, contagens = np.unique(banca.drawdowns_maximos, return_counts=True)
+    fig_drawdown = go.Figure(go.Bar(x=valores, y=contagens / banca.n_trajetorias, marker_color='orange'))
+    fig_drawdown.update_layout(title="Distribuição do Drawdown Máximo", xaxis_title="Drawdown máximo",
+                               yaxis_title="Fração das trajetórias", yaxis_tickformat='.1%')
+    st.plotly_chart(fig_drawdown, use_container_width=True)
+    
+    percentis_drawdown = np.percentile(banca.drawdowns_maximos, banca.percentis, method='lower')
+    st.dataframe(pd.DataFrame({
+        'Percentil': [f"P{p}" for p in banca.percentis],
+        'Drawdown Máximo': percentis_drawdown,
+        'Banca Final': np.percentile(banca.bancas_finais, banca.percentis, method='lower')
+    }), use_container_width=True, hide_index=True)
+
 # Seção de informações
 def criar_secao_info():
     """Cria seção informativa sobre o simulador."""
@@ -434,11 +1168,21 @@ def criar_secao_info():
         ### 🔧 Configurações
         
         - **Intervalo [0-20]**: Permite análise com 21 números (441 combinações)
-        - **Simulações**: De 1.000 a 1.000.000 repetições
-        - **Seed**: Para reprodutibilidade dos resultados
+        - **Simulações**: De 1.000 a 1.000.000.000 repetições
+        - **Modo Streaming**: Processa em blocos com memória constante
+        - **Modo Paralelo**: Divide os blocos entre processos, com resultado reprodutível pela seed
+        - **Modo Somente Paridade**: Sorteia só a paridade de cada jogador em bits compactados
+        - **Seed**: Para reprodutibilidade dos resultados (os dados detalhados são regenerados a partir dela)
+        - **Estratégias**: Jogadores com distribuições não uniformes e partidas com até 10 jogadores
+        - **Convergência**: Acompanha P(par) em pontos log-espaçados e pode parar ao atingir a precisão desejada
+        - **Banca**: Partidas sucessivas com aposta fixa, probabilidade de ruína, drawdown e faixas de percentis
+        - **Cache**: Configurações já simuladas (inclusive por outros usuários) retornam instantaneamente
         - **Nível de Confiança**: Para intervalos estatísticos
         """)
 
 if __name__ == "__main__":
     main()
+    criar_secao_estrategias()
+    criar_secao_varredura()
+    criar_secao_banca()
     criar_secao_info()
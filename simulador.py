@@ -0,0 +1,1835 @@
+"""Núcleo de cálculo do simulador Par ou Ímpar, sem dependência do Streamlit.
+
+Reúne motores de simulação, estatísticas, cache e exportação usados por
+gestao.py. NumPy, pandas e SciPy só são importados no primeiro uso, para
+que o módulo possa ser importado rapidamente em scripts e jobs em lote.
+
+Uso em linha de comando:
+    python simulador.py simular -n 10000000 --modo paralelo --seed 42 --saida resultado.npz
+    python simulador.py varrer --limite-superior 30 -n 100000 --saida varredura.csv
+    python simulador.py banca --trajetorias 100000 --jogos 10000 --banca-inicial 50 --seed 42
+"""
+import argparse
+import gzip
+import importlib
+import importlib.util
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+from statistics import NormalDist
+
+
+class _ModuloTardio:
+    """Importa o módulo no primeiro acesso a um atributo e passa a usá-lo diretamente."""
+
+    def __init__(self, nome, apelido):
+        self._nome = nome
+        self._apelido = apelido
+
+    def __getattr__(self, atributo):
+        modulo = importlib.import_module(self._nome)
+        globals()[self._apelido] = modulo
+        return getattr(modulo, atributo)
+
+
+np = _ModuloTardio('numpy', 'np')
+pd = _ModuloTardio('pandas', 'pd')
+
+# Acima deste tamanho a convolução direta (O(n²)) perde para a FFT
+LIMITE_CONVOLUCAO_DIRETA = 512
+
+def convolver_distribuicoes(dist_a, dist_b):
+    """Convolui duas distribuições discretas (contagens ou probabilidades).
+
+    Vetores pequenos usam np.convolve; vetores grandes usam FFT. Quando as
+    duas entradas são contagens inteiras o resultado é arredondado de volta
+    para inteiros, preservando a exatidão.
+    """
+    dist_a = np.asarray(dist_a)
+    dist_b = np.asarray(dist_b)
+    if min(len(dist_a), len(dist_b)) <= LIMITE_CONVOLUCAO_DIRETA:
+        return np.convolve(dist_a, dist_b)
+
+    from scipy import signal
+    resultado = signal.fftconvolve(dist_a.astype(float), dist_b.astype(float))
+    if np.issubdtype(dist_a.dtype, np.integer) and np.issubdtype(dist_b.dtype, np.integer):
+        return np.rint(resultado).astype(np.int64)
+    # Ruído numérico da FFT pode gerar valores levemente negativos
+    return np.clip(resultado, 0, None)
+
+# Tamanho padrão dos blocos do modo streaming (memória constante)
+TAMANHO_BLOCO_PADRAO = 1 << 18
+
+# Acima deste número de simulações apenas o modo streaming é viável
+LIMITE_MODO_VETORIZADO = 1_000_000
+
+def combinar_momentos(n_a, media_a, m2_a, n_b, media_b, m2_b):
+    """Combina média e soma dos quadrados dos desvios de dois lotes (Chan et al.)."""
+    n = n_a + n_b
+    if n == 0:
+        return 0, 0.0, 0.0
+    delta = media_b - media_a
+    media = media_a + delta * n_b / n
+    m2 = m2_a + m2_b + delta ** 2 * n_a * n_b / n
+    return n, media, m2
+
+# Tamanho fixo dos blocos do modo paralelo: a divisão em blocos (e portanto
+# as sementes de cada bloco) não depende do número de processos
+TAMANHO_BLOCO_PARALELO = 1 << 22
+
+def _simular_bloco_contadores(min_numero, max_numero, n_simulacoes, semente):
+    """Simula um bloco com Generator próprio e devolve seus contadores.
+    
+    Função de módulo para poder ser enviada a um ProcessPoolExecutor.
+    """
+    rng = np.random.default_rng(semente)
+    deslocamento = 2 * min_numero
+    histograma = np.zeros(2 * (max_numero - min_numero) + 1, dtype=np.int64)
+    vitorias_par = 0
+    n_acumulado, media, m2 = 0, 0.0, 0.0
+    
+    while n_acumulado < n_simulacoes:
+        tamanho = min(TAMANHO_BLOCO_PADRAO, n_simulacoes - n_acumulado)
+        
+        somas = rng.integers(min_numero, max_numero + 1, tamanho)
+        somas += rng.integers(min_numero, max_numero + 1, tamanho)
+        
+        vitorias_par += int(np.count_nonzero((somas & 1) == 0))
+        histograma += np.bincount(somas - deslocamento, minlength=len(histograma))
+        
+        media_bloco = somas.mean()
+        m2_bloco = float(np.dot(somas - media_bloco, somas - media_bloco))
+        n_acumulado, media, m2 = combinar_momentos(n_acumulado, media, m2, tamanho, media_bloco, m2_bloco)
+    
+    return vitorias_par, histograma, media, m2
+
+# Simulações por sub-bloco do motor de paridade (64 por palavra de 64 bits)
+TAMANHO_BLOCO_PARIDADE = 1 << 24
+
+# Limite de dígitos binários da probabilidade usados na geração de bits;
+# posições ainda indecisas depois disso têm probabilidade < 2^-128
+MAX_DIGITOS_BERNOULLI = 128
+
+# Tabela de popcount por byte, usada quando np.bitwise_count não existe (NumPy < 2.0)
+_POPCOUNT_BYTE = bytes(bin(i).count('1') for i in range(256))
+
+def contar_bits(palavras):
+    """Conta os bits 1 de um array uint64 (popcount)."""
+    if hasattr(np, 'bitwise_count'):
+        return int(np.bitwise_count(palavras).sum(dtype=np.int64))
+    tabela = np.frombuffer(_POPCOUNT_BYTE, dtype=np.uint8)
+    return int(tabela[palavras.view(np.uint8)].sum(dtype=np.int64))
+
+def gerar_bits_bernoulli(rng, n_palavras, numerador, denominador):
+    """Gera palavras uint64 em que cada bit vale 1 com probabilidade numerador/denominador.
+    
+    Cada bit compara um uniforme aleatório com a expansão binária exata da
+    fração, dígito a dígito e nas 64 posições de uma vez. Quase todas as
+    posições se decidem nos primeiros dígitos; só as palavras com alguma
+    posição indecisa continuam consumindo bits aleatórios. Com
+    probabilidade 1/2 basta uma palavra aleatória por palavra gerada.
+    """
+    if numerador >= denominador:
+        return np.full(n_palavras, np.iinfo(np.uint64).max, dtype=np.uint64)
+    
+    resultado = np.zeros(n_palavras, dtype=np.uint64)
+    indecisos = np.full(n_palavras, np.iinfo(np.uint64).max, dtype=np.uint64)
+    ativos = None  # None: todas as palavras ainda estão em jogo
+    resto = numerador
+    
+    for _ in range(MAX_DIGITOS_BERNOULLI):
+        if resto == 0:
+            break
+        resto *= 2
+        digito = resto >= denominador
+        if digito:
+            resto -= denominador
+        
+        aleatorio = rng.bit_generator.random_raw(len(indecisos))
+        if digito:
+            # Bit aleatório 0 onde a fração tem 1: uniforme < p, posição vale 1
+            decididos = indecisos & ~aleatorio
+            if ativos is None:
+                resultado |= decididos
+            else:
+                resultado[ativos] |= decididos
+            indecisos &= aleatorio
+        else:
+            # Bit aleatório 1 onde a fração tem 0: uniforme > p, posição vale 0
+            indecisos &= ~aleatorio
+        
+        # Compacta só quando menos da metade das palavras segue indecisa
+        vivos = indecisos != 0
+        n_vivos = int(np.count_nonzero(vivos))
+        if n_vivos == 0:
+            break
+        if n_vivos < len(indecisos) // 2:
+            ativos = np.flatnonzero(vivos) if ativos is None else ativos[vivos]
+            indecisos = indecisos[vivos]
+    
+    return resultado
+
+def _simular_bloco_paridade(n_pares, range_numeros, n_simulacoes, semente):
+    """Simula um bloco apenas pela paridade de cada jogador e devolve as vitórias do par.
+    
+    Cada jogador é um bit (1 = número par) com a massa exata de pares do
+    intervalo; a soma é ímpar onde os bits diferem, então as vitórias do
+    ímpar são o popcount do XOR das palavras dos dois jogadores.
+    """
+    rng = np.random.default_rng(semente)
+    vitorias_impar = 0
+    n_acumulado = 0
+    
+    while n_acumulado < n_simulacoes:
+        tamanho = min(TAMANHO_BLOCO_PARIDADE, n_simulacoes - n_acumulado)
+        n_palavras = -(-tamanho // 64)
+        
+        impares = gerar_bits_bernoulli(rng, n_palavras, n_pares, range_numeros)
+        impares ^= gerar_bits_bernoulli(rng, n_palavras, n_pares, range_numeros)
+        
+        # Descarta as posições excedentes da última palavra
+        sobra = n_palavras * 64 - tamanho
+        if sobra:
+            impares[-1] &= np.uint64((1 << (64 - sobra)) - 1)
+        
+        vitorias_impar += contar_bits(impares)
+        n_acumulado += tamanho
+    
+    return n_simulacoes - vitorias_impar
+
+# Incremento do gerador splitmix64 (razão áurea em 64 bits)
+GAMA_SPLITMIX64 = 0x9E3779B97F4A7C15
+
+def numba_disponivel():
+    """Indica se o kernel compilado pode usar Numba (dependência opcional)."""
+    return importlib.util.find_spec('numba') is not None
+
+def _misturar_splitmix64(z):
+    """Função de saída do splitmix64; vale para arrays uint64 e, compilada, para escalares."""
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+def _inteiro_uniforme(x, faixa):
+    """Mapeia 64 bits aleatórios em [0, faixa) pelos 32 bits altos (viés < faixa / 2^32)."""
+    return ((x >> np.uint64(32)) * faixa) >> np.uint64(32)
+
+# Simulações por passo do caminho NumPy do gerador por contador (temporários cabem no cache)
+TAMANHO_BLOCO_CONTADOR = 1 << 14
+
+def _histograma_contador_numpy(chave, inicio, n_simulacoes, range_numeros):
+    """Histograma das somas (em deslocamentos desde 2·min) com o gerador por contador, em NumPy.
+    
+    O sorteio do jogador k (0 ou 1) na simulação i vem do contador
+    2·i + k + 1, então qualquer trecho [inicio, inicio + n) é gerado de
+    forma independente e idêntica à do kernel Numba.
+    """
+    histograma = np.zeros(2 * range_numeros - 1, dtype=np.int64)
+    for passo in range(inicio, inicio + n_simulacoes, TAMANHO_BLOCO_CONTADOR):
+        tamanho = min(TAMANHO_BLOCO_CONTADOR, inicio + n_simulacoes - passo)
+        contadores = np.arange(2 * passo + 1, 2 * (passo + tamanho) + 1, dtype=np.uint64)
+        sorteios = _inteiro_uniforme(
+            _misturar_splitmix64(np.uint64(chave) + contadores * np.uint64(GAMA_SPLITMIX64)),
+            np.uint64(range_numeros)
+        )
+        somas = sorteios[0::2] + sorteios[1::2]
+        histograma += np.bincount(somas.astype(np.intp), minlength=len(histograma))
+    return histograma
+
+_KERNEL_NUMBA = None
+
+def _obter_kernel_numba():
+    """Compila (uma vez por processo) o kernel Numba que funde sorteio, soma e histograma."""
+    global _KERNEL_NUMBA
+    if _KERNEL_NUMBA is None:
+        import numba
+        
+        misturar = numba.njit(_misturar_splitmix64)
+        inteiro_uniforme = numba.njit(_inteiro_uniforme)
+        gama = np.uint64(GAMA_SPLITMIX64)
+        
+        @numba.njit(parallel=True)
+        def kernel(chave, inicio, n_simulacoes, range_numeros, n_fatias):
+            faixa = np.uint64(range_numeros)
+            histogramas = np.zeros((n_fatias, 2 * range_numeros - 1), dtype=np.int64)
+            tamanho_fatia = (n_simulacoes + n_fatias - 1) // n_fatias
+            # Cada fatia tem seu próprio histograma: nenhuma escrita compartilhada entre threads
+            for fatia in numba.prange(n_fatias):
+                primeiro = fatia * tamanho_fatia
+                ultimo = min(n_simulacoes, primeiro + tamanho_fatia)
+                for i in range(primeiro, ultimo):
+                    contador = np.uint64(2 * (inicio + i) + 1)
+                    numero_j1 = inteiro_uniforme(misturar(chave + contador * gama), faixa)
+                    numero_j2 = inteiro_uniforme(misturar(chave + (contador + np.uint64(1)) * gama), faixa)
+                    histogramas[fatia, np.intp(numero_j1 + numero_j2)] += 1
+            return histogramas.sum(axis=0)
+        
+        _KERNEL_NUMBA = kernel
+    return _KERNEL_NUMBA
+
+def histograma_contador(chave, inicio, n_simulacoes, range_numeros, usar_numba=None):
+    """Histograma das somas do gerador por contador, pelo kernel Numba ou pelo NumPy.
+    
+    usar_numba=None usa Numba quando instalado. Os dois caminhos produzem
+    exatamente o mesmo histograma.
+    """
+    if usar_numba is None:
+        usar_numba = numba_disponivel()
+    if not usar_numba:
+        return _histograma_contador_numpy(chave, inicio, n_simulacoes, range_numeros)
+    import numba
+    kernel = _obter_kernel_numba()
+    n_fatias = max(1, min(numba.get_num_threads(), n_simulacoes))
+    return kernel(np.uint64(chave), inicio, n_simulacoes, range_numeros, n_fatias)
+
+def intervalo_wilson(sucessos, n_tentativas, confianca=0.95):
+    """Intervalo de Wilson; aceita escalares ou arrays (vetorizado)."""
+    z = NormalDist().inv_cdf((1 + confianca) / 2)
+    p = sucessos / n_tentativas
+    n = n_tentativas
+    
+    denominador = 1 + z**2 / n
+    centro = (p + z**2 / (2*n)) / denominador
+    margem = z * np.sqrt((p*(1-p) + z**2/(4*n)) / n) / denominador
+    
+    return (centro - margem, centro + margem)
+
+# Frequência esperada mínima por classe nos testes de aderência (regra usual do qui-quadrado)
+FREQUENCIA_ESPERADA_MINIMA = 5
+
+def agrupar_classes(esperadas, minimo=FREQUENCIA_ESPERADA_MINIMA):
+    """Índices de início de grupos de classes adjacentes com frequência esperada >= minimo.
+    
+    Acumula da esquerda para a direita; um resto final abaixo do mínimo é
+    unido ao último grupo.
+    """
+    inicios = []
+    acumulado = 0.0
+    for indice, esperada in enumerate(esperadas):
+        if acumulado == 0.0:
+            inicios.append(indice)
+        acumulado += esperada
+        if acumulado >= minimo:
+            acumulado = 0.0
+    if acumulado and len(inicios) > 1:
+        inicios.pop()
+    return np.array(inicios, dtype=np.intp)
+
+def teste_aderencia(contagens, probabilidades, minimo=FREQUENCIA_ESPERADA_MINIMA):
+    """Qui-quadrado de Pearson e teste G de contagens contra uma distribuição exata.
+    
+    contagens pode ter uma linha por réplica (última dimensão = classes,
+    todas com o mesmo total). Classes com frequência esperada abaixo de
+    minimo são agrupadas com as vizinhas. Retorna um dict com estatísticas
+    e p-valores (escalares ou arrays, conforme a entrada).
+    """
+    from scipy import stats
+    
+    contagens = np.asarray(contagens)
+    n_total = contagens.sum(axis=-1).flat[0]
+    esperadas_classes = np.asarray(probabilidades) * n_total
+    
+    inicios = agrupar_classes(esperadas_classes, minimo)
+    observadas = np.add.reduceat(contagens, inicios, axis=-1).astype(float)
+    esperadas = np.add.reduceat(esperadas_classes, inicios)
+    graus_liberdade = len(inicios) - 1
+    
+    qui_quadrado = ((observadas - esperadas) ** 2 / esperadas).sum(axis=-1)
+    # Classes sem observações não contribuem para G (limite de x·ln x em 0)
+    razao = np.where(observadas > 0, observadas / esperadas, 1.0)
+    estatistica_g = 2 * (observadas * np.log(razao)).sum(axis=-1)
+    
+    return {
+        'qui_quadrado': qui_quadrado,
+        'p_qui_quadrado': stats.chi2.sf(qui_quadrado, graus_liberdade) if graus_liberdade else np.nan,
+        'g': estatistica_g,
+        'p_g': stats.chi2.sf(estatistica_g, graus_liberdade) if graus_liberdade else np.nan,
+        'graus_liberdade': graus_liberdade,
+        'classes': len(esperadas_classes),
+        'classes_agrupadas': len(inicios)
+    }
+
+def resumir_pvalores(pvalores, alfa=0.05):
+    """Taxa de rejeição ao nível alfa e p-valor de Kolmogorov-Smirnov contra a uniforme."""
+    from scipy import stats
+    
+    pvalores = np.asarray(pvalores)
+    return {
+        'taxa_rejeicao': float(np.mean(pvalores < alfa)),
+        'p_uniformidade': float(stats.kstest(pvalores, 'uniform').pvalue)
+    }
+
+# Modos de simular com redução de variância
+METODOS_REDUCAO_VARIANCIA = ('estratificado', 'antitetico', 'hipercubo')
+
+# Mínimo de lotes independentes do hipercubo latino (estimativa da variância)
+LOTES_HIPERCUBO = 64
+
+# Elementos (trajetórias × jogos) por bloco da simulação de bancas e largura máxima do bloco
+TAMANHO_BLOCO_BANCA = 1 << 20
+COLUNAS_BLOCO_BANCA = 1024
+
+# Percentis das faixas e número de pontos de registro da simulação de bancas
+PERCENTIS_BANCA = (5, 25, 50, 75, 95)
+PONTOS_BANCA = 200
+
+# Réplicas por bloco nos atalhos multinomiais (limita a matriz réplicas × classes)
+TAMANHO_BLOCO_REPLICAS = 1 << 16
+
+# Pontos de registro por década no acompanhamento de convergência
+PONTOS_POR_DECADA = 20
+
+def pontos_convergencia(n_simulacoes, pontos_por_decada=PONTOS_POR_DECADA):
+    """Pontos inteiros log-espaçados de 10 até n_simulacoes (inclusive), sem repetição."""
+    if n_simulacoes <= 10:
+        return np.array([n_simulacoes], dtype=np.int64)
+    n_pontos = int(np.ceil(np.log10(n_simulacoes / 10) * pontos_por_decada)) + 1
+    pontos = np.unique(np.round(np.logspace(1, np.log10(n_simulacoes), n_pontos)).astype(np.int64))
+    pontos[-1] = n_simulacoes
+    return pontos
+
+def dtype_numeros(min_valor, max_valor):
+    """Menor dtype inteiro capaz de representar todo o intervalo [min_valor, max_valor]."""
+    if min_valor >= 0:
+        for dtype in (np.uint8, np.uint16, np.uint32):
+            if max_valor <= np.iinfo(dtype).max:
+                return dtype
+    return np.int64
+
+def gerar_sorteios(min_numero, max_numero, n_simulacoes, seed):
+    """Gera os sorteios do modo vetorizado nos dtypes mais compactos.
+    
+    A mesma seed sempre produz os mesmos números, o que permite regenerar
+    os dados brutos sob demanda em vez de mantê-los em memória.
+    """
+    rng = np.random.default_rng(seed)
+    dtype = dtype_numeros(min_numero, max_numero)
+    numeros_j1 = rng.integers(min_numero, max_numero + 1, n_simulacoes, dtype=dtype)
+    numeros_j2 = rng.integers(min_numero, max_numero + 1, n_simulacoes, dtype=dtype)
+    somas = numeros_j1.astype(dtype_numeros(2 * min_numero, 2 * max_numero))
+    somas += numeros_j2
+    return numeros_j1, numeros_j2, somas
+
+class ResultadoSimulacao:
+    """Resultado compacto de uma simulação, próprio para o session_state.
+    
+    Guarda apenas a configuração e os agregados (vitórias, histograma e
+    momentos das somas). Os sorteios brutos do modo vetorizado não ficam em
+    memória: materializar() os regenera a partir de (seed, intervalo, n).
+    """
+    
+    __slots__ = ('min_numero', 'max_numero', 'n_simulacoes', 'seed', 'modo',
+                 'vitorias_par', 'vitorias_impar', 'prob_par_obs', 'prob_impar_obs',
+                 'tempo_execucao', 'histograma_somas', 'media_somas', 'desvio_padrao_somas',
+                 'convergencia', 'n_jogadores', 'estimativa_ajustada',
+                 '_tabela_frequencias', '_estatisticas_somas')
+    
+    def __init__(self, min_numero, max_numero, n_simulacoes, seed, modo, vitorias_par,
+                 tempo_execucao, histograma_somas=None, media_somas=None, desvio_padrao_somas=None,
+                 convergencia=None, n_jogadores=2, estimativa_ajustada=None):
+        self.min_numero = min_numero
+        self.max_numero = max_numero
+        self.n_simulacoes = n_simulacoes
+        self.seed = seed
+        self.modo = modo
+        self.vitorias_par = int(vitorias_par)
+        self.vitorias_impar = n_simulacoes - self.vitorias_par
+        self.prob_par_obs = self.vitorias_par / n_simulacoes
+        self.prob_impar_obs = self.vitorias_impar / n_simulacoes
+        self.tempo_execucao = tempo_execucao
+        self.histograma_somas = histograma_somas
+        self.media_somas = media_somas
+        self.desvio_padrao_somas = desvio_padrao_somas
+        # Histórico de P(par) e do intervalo de Wilson em pontos log-espaçados
+        self.convergencia = convergencia
+        self.n_jogadores = n_jogadores
+        # Estimador de P(par) dos modos de redução de variância e seu tamanho efetivo de amostra
+        self.estimativa_ajustada = estimativa_ajustada
+        if estimativa_ajustada is not None:
+            self.prob_par_obs = estimativa_ajustada['prob_par']
+            self.prob_impar_obs = 1 - self.prob_par_obs
+        self._tabela_frequencias = None
+        self._estatisticas_somas = None
+    
+    @property
+    def tem_somas(self):
+        """Indica se o histograma das somas foi registrado."""
+        return self.histograma_somas is not None
+    
+    @property
+    def regeneravel(self):
+        """Indica se os sorteios brutos podem ser regenerados."""
+        return self.modo == 'vetorizado'
+    
+    def somas_possiveis(self):
+        """Valores de soma cobertos pelo histograma, do menor ao maior."""
+        return np.arange(self.n_jogadores * self.min_numero, self.n_jogadores * self.max_numero + 1)
+    
+    def materializar(self):
+        """Regenera (numeros_j1, numeros_j2, somas) idênticos aos da simulação."""
+        if not self.regeneravel:
+            raise ValueError(f"Sorteios do modo '{self.modo}' não podem ser regenerados.")
+        return gerar_sorteios(self.min_numero, self.max_numero, self.n_simulacoes, self.seed)
+    
+    def salvar(self, arquivo):
+        """Grava configuração e agregados num arquivo npz."""
+        campos = {
+            'min_numero': self.min_numero,
+            'max_numero': self.max_numero,
+            'n_simulacoes': self.n_simulacoes,
+            # A seed pode ter 128 bits (entropia sorteada); vai como texto
+            'seed': str(self.seed),
+            'modo': self.modo,
+            'vitorias_par': self.vitorias_par,
+            'tempo_execucao': self.tempo_execucao,
+            'n_jogadores': self.n_jogadores
+        }
+        if self.tem_somas:
+            campos.update(histograma_somas=self.histograma_somas, media_somas=self.media_somas,
+                          desvio_padrao_somas=self.desvio_padrao_somas)
+        if self.convergencia is not None:
+            campos.update({f"convergencia_{nome}": valor for nome, valor in self.convergencia.items()
+                           if valor is not None})
+        if self.estimativa_ajustada is not None:
+            campos.update({f"estimativa_{nome}": valor for nome, valor in self.estimativa_ajustada.items()})
+        np.savez_compressed(arquivo, **campos)
+    
+    @classmethod
+    def carregar(cls, arquivo):
+        """Lê um resultado gravado por salvar()."""
+        with np.load(arquivo) as dados:
+            tem_somas = 'histograma_somas' in dados
+            convergencia = {
+                nome[len('convergencia_'):]: (dados[nome] if dados[nome].ndim else dados[nome].item())
+                for nome in dados.files if nome.startswith('convergencia_')
+            } or None
+            if convergencia is not None:
+                convergencia.setdefault('tolerancia', None)
+            estimativa_ajustada = {
+                nome[len('estimativa_'):]: dados[nome].item()
+                for nome in dados.files if nome.startswith('estimativa_')
+            } or None
+            return cls(
+                int(dados['min_numero']), int(dados['max_numero']), int(dados['n_simulacoes']),
+                int(str(dados['seed'])), str(dados['modo']), int(dados['vitorias_par']),
+                float(dados['tempo_execucao']),
+                dados['histograma_somas'] if tem_somas else None,
+                float(dados['media_somas']) if tem_somas else None,
+                float(dados['desvio_padrao_somas']) if tem_somas else None,
+                convergencia,
+                int(dados['n_jogadores']) if 'n_jogadores' in dados else 2,
+                estimativa_ajustada
+            )
+    
+    def tabela_frequencias(self):
+        """Tabela de frequência de todas as somas possíveis, montada uma única vez.
+        
+        Vem direto do histograma (bincount) acumulado na simulação, então
+        tem k·(range-1)+1 linhas (k jogadores) independentemente de n_simulacoes.
+        """
+        if self._tabela_frequencias is None:
+            somas = self.somas_possiveis()
+            self._tabela_frequencias = pd.DataFrame({
+                'Soma': somas,
+                'Frequência': self.histograma_somas,
+                'Probabilidade': self.histograma_somas / self.n_simulacoes,
+                'Tipo': np.where(somas % 2 == 0, 'Par', 'Ímpar')
+            })
+        return self._tabela_frequencias
+    
+    def estatisticas_somas(self):
+        """Média, mediana, desvio padrão e moda das somas calculados das contagens em O(range)."""
+        if self._estatisticas_somas is None:
+            somas = self.somas_possiveis()
+            contagens = self.histograma_somas
+            media = np.dot(somas, contagens) / self.n_simulacoes
+            variancia = np.dot((somas - media) ** 2, contagens) / self.n_simulacoes
+            
+            # Mediana como em np.median: média dos dois valores centrais
+            acumulado = np.cumsum(contagens)
+            inferior = somas[np.searchsorted(acumulado, (self.n_simulacoes - 1) // 2, side='right')]
+            superior = somas[np.searchsorted(acumulado, self.n_simulacoes // 2, side='right')]
+            
+            self._estatisticas_somas = {
+                'media': media,
+                'mediana': (inferior + superior) / 2,
+                'desvio_padrao': np.sqrt(variancia),
+                'moda': somas[np.argmax(contagens)]
+            }
+        return self._estatisticas_somas
+
+class ResultadoBanca:
+    """Resultado da simulação de bancas em jogos sucessivos.
+    
+    Guarda por trajetória apenas o instante de ruína (-1 se não houve),
+    o drawdown máximo e a banca final; a evolução de todas as trajetórias
+    fica resumida em faixas de percentis nos pontos de registro.
+    """
+    
+    __slots__ = ('n_trajetorias', 'n_jogos', 'banca_inicial', 'aposta', 'limite_ruina', 'aposta_em',
+                 'seed', 'pontos', 'percentis', 'bandas', 'tempos_ruina', 'drawdowns_maximos',
+                 'bancas_finais', 'tempo_execucao')
+    
+    def __init__(self, n_trajetorias, n_jogos, banca_inicial, aposta, limite_ruina, aposta_em, seed,
+                 pontos, percentis, bandas, tempos_ruina, drawdowns_maximos, bancas_finais, tempo_execucao):
+        self.n_trajetorias = n_trajetorias
+        self.n_jogos = n_jogos
+        self.banca_inicial = banca_inicial
+        self.aposta = aposta
+        self.limite_ruina = limite_ruina
+        self.aposta_em = aposta_em
+        self.seed = seed
+        # Jogos (1..n_jogos) em que as faixas de percentis foram registradas
+        self.pontos = pontos
+        self.percentis = percentis
+        # bandas[i, j]: percentil percentis[i] da banca após pontos[j] jogos
+        self.bandas = bandas
+        self.tempos_ruina = tempos_ruina
+        self.drawdowns_maximos = drawdowns_maximos
+        self.bancas_finais = bancas_finais
+        self.tempo_execucao = tempo_execucao
+    
+    @property
+    def ruinas(self):
+        """Número de trajetórias que atingiram o limite de ruína."""
+        return int(np.count_nonzero(self.tempos_ruina >= 0))
+    
+    @property
+    def prob_ruina(self):
+        """Fração das trajetórias arruinadas dentro do horizonte."""
+        return self.ruinas / self.n_trajetorias
+    
+    def curva_ruina(self):
+        """Probabilidade acumulada de ruína até cada jogo (índice 0 = jogo 1)."""
+        tempos = self.tempos_ruina[self.tempos_ruina >= 0]
+        return np.cumsum(np.bincount(tempos - 1, minlength=self.n_jogos)) / self.n_trajetorias
+
+class SimuladorParOuImpar:
+    """Classe para simulação do jogo Par ou Ímpar."""
+    
+    def __init__(self, min_numero=0, max_numero=20):
+        self.min_numero = min_numero
+        self.max_numero = max_numero
+        self.range_numeros = max_numero - min_numero + 1
+        self.n_pares, self.n_impares = self._contar_paridades()
+        self.prob_teorica_par, self.prob_teorica_impar = self._calcular_probabilidades_teoricas()
+        self._distribuicao_somas = None
+    
+    def _contar_paridades(self):
+        """Conta quantos números pares e ímpares existem no intervalo."""
+        n_pares = self.max_numero // 2 - (self.min_numero - 1) // 2
+        return n_pares, self.range_numeros - n_pares
+    
+    def _calcular_probabilidades_teoricas(self):
+        """Calcula probabilidades teóricas exatas em O(1).
+        
+        A soma é par quando os dois números têm a mesma paridade, portanto
+        P(par) = (pares² + ímpares²) / range².
+        """
+        total_combinacoes = self.range_numeros ** 2
+        combinacoes_par = self.n_pares ** 2 + self.n_impares ** 2
+        prob_par = combinacoes_par / total_combinacoes
+        return prob_par, 1 - prob_par
+    
+    def distribuicao_somas_teorica(self):
+        """Retorna (somas, probabilidades) exatas da soma dos dois jogadores.
+        
+        A distribuição é a convolução das distribuições uniformes dos
+        jogadores; é calculada uma única vez e reaproveitada.
+        """
+        if self._distribuicao_somas is None:
+            contagens_jogador = np.ones(self.range_numeros, dtype=np.int64)
+            contagens = convolver_distribuicoes(contagens_jogador, contagens_jogador)
+            somas = np.arange(2 * self.min_numero, 2 * self.max_numero + 1)
+            self._distribuicao_somas = (somas, contagens / self.range_numeros ** 2)
+        return self._distribuicao_somas
+    
+    def simular(self, n_simulacoes, seed=None, modo='vetorizado',
+                tamanho_bloco=TAMANHO_BLOCO_PADRAO, callback_progresso=None,
+                n_processos=None, convergencia=False, tolerancia=None, confianca=0.95,
+                cancelar=None):
+        """Executa simulação Monte Carlo.
+        
+        modo='vetorizado' gera todos os sorteios de uma vez (regeneráveis
+        depois pela seed); modo='streaming' processa blocos de tamanho fixo
+        e guarda apenas contadores, com memória constante; modo='paralelo'
+        distribui blocos entre n_processos processos, com resultado
+        idêntico para a mesma seed qualquer que seja o número de processos;
+        modo='paridade' usa o mesmo esquema de blocos mas sorteia apenas a
+        paridade de cada jogador em bits compactados, sem registrar somas.
+        Os modos 'estratificado', 'antitetico' e 'hipercubo' aplicam
+        redução de variância (ver _simular_reducao_variancia); modo='compilado'
+        usa o kernel Numba (ou seu equivalente em NumPy) de _simular_compilado.
+        
+        No modo streaming, convergencia=True registra P(par) e o intervalo
+        de Wilson em pontos log-espaçados, e tolerancia interrompe a
+        simulação quando a meia-largura do intervalo fica abaixo dela.
+        
+        cancelar é um threading.Event opcional, verificado após cada bloco
+        dos modos em blocos: quando sinalizado, a simulação para e o
+        resultado parcial (com pelo menos um bloco) é retornado.
+        Retorna sempre um ResultadoSimulacao.
+        """
+        # Sem seed, sorteia uma entropia e a registra para permitir regenerar os dados
+        if seed is None:
+            seed = np.random.SeedSequence().entropy
+        
+        if (convergencia or tolerancia) and modo != 'streaming':
+            raise ValueError("O acompanhamento de convergência só está disponível no modo streaming.")
+        
+        if modo == 'streaming':
+            return self._simular_streaming(n_simulacoes, seed, tamanho_bloco, callback_progresso,
+                                           convergencia, tolerancia, confianca, cancelar)
+        if modo == 'paralelo':
+            return self._simular_paralelo(n_simulacoes, seed, n_processos, callback_progresso, cancelar)
+        if modo == 'paridade':
+            return self._simular_paridade(n_simulacoes, seed, n_processos, callback_progresso, cancelar)
+        if modo == 'compilado':
+            return self._simular_compilado(n_simulacoes, seed, callback_progresso, cancelar)
+        if modo in METODOS_REDUCAO_VARIANCIA:
+            return self._simular_reducao_variancia(n_simulacoes, seed, modo, tamanho_bloco, callback_progresso,
+                                                   cancelar)
+        
+        inicio = time.time()
+        
+        # Geração vetorizada; os arrays são descartados após a agregação
+        _, _, somas = gerar_sorteios(self.min_numero, self.max_numero, n_simulacoes, seed)
+        
+        vitorias_par = np.count_nonzero((somas & 1) == 0)
+        histograma = np.bincount(somas - 2 * self.min_numero, minlength=2 * self.range_numeros - 1)
+        media = somas.mean()
+        desvio_padrao = somas.std()
+        del somas
+        
+        if callback_progresso:
+            callback_progresso(1.0)
+        
+        return self._criar_resultado(n_simulacoes, seed, 'vetorizado', vitorias_par, inicio,
+                                     histograma, media, desvio_padrao)
+    
+    def _criar_resultado(self, n_simulacoes, seed, modo, vitorias_par, inicio,
+                         histograma=None, media=None, desvio_padrao=None, convergencia=None,
+                         estimativa_ajustada=None):
+        """Monta o ResultadoSimulacao compacto de uma execução."""
+        return ResultadoSimulacao(
+            self.min_numero, self.max_numero, n_simulacoes, seed, modo, vitorias_par,
+            time.time() - inicio, histograma, media, desvio_padrao, convergencia,
+            estimativa_ajustada=estimativa_ajustada
+        )
+    
+    def _simular_streaming(self, n_simulacoes, seed, tamanho_bloco, callback_progresso,
+                           convergencia=False, tolerancia=None, confianca=0.95, cancelar=None):
+        """Simula em blocos mantendo só vitórias, histograma e momentos das somas.
+        
+        Os pontos de convergência saem da soma acumulada das vitórias dentro
+        do bloco corrente; nenhum dado por simulação é mantido entre blocos.
+        """
+        rng = np.random.default_rng(seed)
+        
+        inicio = time.time()
+        
+        deslocamento = 2 * self.min_numero
+        histograma = np.zeros(2 * self.range_numeros - 1, dtype=np.int64)
+        vitorias_par = 0
+        n_acumulado, media, m2 = 0, 0.0, 0.0
+        
+        acompanhar = convergencia or bool(tolerancia)
+        pontos = pontos_convergencia(n_simulacoes) if acompanhar else np.empty(0, dtype=np.int64)
+        proximo_ponto = 0
+        vitorias_pontos = []
+        parada_antecipada = False
+        
+        while n_acumulado < n_simulacoes and not parada_antecipada:
+            tamanho = min(tamanho_bloco, n_simulacoes - n_acumulado)
+            
+            somas = rng.integers(self.min_numero, self.max_numero + 1, tamanho)
+            somas += rng.integers(self.min_numero, self.max_numero + 1, tamanho)
+            pares = (somas & 1) == 0
+            
+            # Pontos de convergência que caem dentro deste bloco
+            fim_pontos = int(np.searchsorted(pontos, n_acumulado + tamanho, side='right'))
+            if fim_pontos > proximo_ponto:
+                pares_acumulados = np.cumsum(pares)
+                for ponto in pontos[proximo_ponto:fim_pontos]:
+                    vitorias_ponto = vitorias_par + int(pares_acumulados[ponto - n_acumulado - 1])
+                    vitorias_pontos.append(vitorias_ponto)
+                    if tolerancia:
+                        inferior, superior = self.calcular_intervalo_confianca(vitorias_ponto, ponto, confianca)
+                        if (superior - inferior) / 2 <= tolerancia:
+                            # Descarta o restante do bloco após o ponto de parada
+                            tamanho = int(ponto) - n_acumulado
+                            somas, pares = somas[:tamanho], pares[:tamanho]
+                            parada_antecipada = True
+                            break
+                proximo_ponto = fim_pontos
+            
+            vitorias_par += int(np.count_nonzero(pares))
+            histograma += np.bincount(somas - deslocamento, minlength=len(histograma))
+            
+            media_bloco = somas.mean()
+            m2_bloco = float(np.dot(somas - media_bloco, somas - media_bloco))
+            n_acumulado, media, m2 = combinar_momentos(n_acumulado, media, m2, tamanho, media_bloco, m2_bloco)
+            
+            if callback_progresso:
+                callback_progresso(n_acumulado / n_simulacoes)
+            if cancelar is not None and cancelar.is_set():
+                break
+        
+        historico = None
+        if acompanhar:
+            n_pontos = pontos[:len(vitorias_pontos)]
+            vitorias_pontos = np.array(vitorias_pontos, dtype=np.int64)
+            ic_inferior, ic_superior = self.calcular_intervalo_confianca(vitorias_pontos, n_pontos, confianca)
+            historico = {
+                'n': n_pontos,
+                'prob_par': vitorias_pontos / n_pontos,
+                'ic_inferior': ic_inferior,
+                'ic_superior': ic_superior,
+                'confianca': confianca,
+                'tolerancia': tolerancia,
+                'n_maximo': n_simulacoes,
+                'parada_antecipada': parada_antecipada
+            }
+        
+        return self._criar_resultado(n_acumulado, seed, 'streaming', vitorias_par, inicio,
+                                     histograma, media, np.sqrt(m2 / n_acumulado), historico)
+    
+    def _executar_blocos(self, funcao_bloco, n_simulacoes, seed, n_processos,
+                         registrar_bloco, callback_progresso, cancelar=None):
+        """Executa funcao_bloco(tamanho, semente) em blocos de tamanho fixo.
+        
+        Cada bloco usa uma semente independente gerada a partir de um único
+        SeedSequence. registrar_bloco(indice, tamanho, resultado) é chamado
+        conforme os blocos terminam; retorna {indice: tamanho} dos blocos
+        concluídos, que são todos a menos que cancelar seja sinalizado.
+        """
+        n_blocos_completos, resto = divmod(n_simulacoes, TAMANHO_BLOCO_PARALELO)
+        tamanhos = [TAMANHO_BLOCO_PARALELO] * n_blocos_completos + ([resto] if resto else [])
+        sementes = np.random.SeedSequence(seed).spawn(len(tamanhos))
+        n_processos = min(n_processos or os.cpu_count() or 1, len(tamanhos))
+        n_processadas = 0
+        concluidos = {}
+        
+        def concluir_bloco(indice, resultado_bloco):
+            """Registra o bloco e indica se a execução deve continuar."""
+            nonlocal n_processadas
+            registrar_bloco(indice, tamanhos[indice], resultado_bloco)
+            concluidos[indice] = tamanhos[indice]
+            n_processadas += tamanhos[indice]
+            if callback_progresso:
+                callback_progresso(n_processadas / n_simulacoes)
+            return cancelar is None or not cancelar.is_set()
+        
+        if n_processos <= 1:
+            for indice, (tamanho, semente) in enumerate(zip(tamanhos, sementes)):
+                if not concluir_bloco(indice, funcao_bloco(tamanho, semente)):
+                    break
+        else:
+            with ProcessPoolExecutor(max_workers=n_processos) as executor:
+                futuros = {
+                    executor.submit(funcao_bloco, tamanho, semente): indice
+                    for indice, (tamanho, semente) in enumerate(zip(tamanhos, sementes))
+                }
+                for futuro in as_completed(futuros):
+                    if not concluir_bloco(futuros[futuro], futuro.result()):
+                        # Blocos já em execução terminam, mas seus resultados são descartados
+                        for pendente in futuros:
+                            pendente.cancel()
+                        break
+        
+        return concluidos
+    
+    def _simular_paralelo(self, n_simulacoes, seed, n_processos, callback_progresso, cancelar=None):
+        """Distribui blocos de tamanho fixo entre processos.
+        
+        Os momentos são combinados na ordem dos blocos, então o resultado
+        não depende da ordem em que os processos terminam.
+        """
+        inicio = time.time()
+        
+        histograma = np.zeros(2 * self.range_numeros - 1, dtype=np.int64)
+        vitorias_par = 0
+        momentos_blocos = {}
+        
+        def registrar_bloco(indice, tamanho, contadores):
+            nonlocal vitorias_par, histograma
+            vitorias_bloco, histograma_bloco, media_bloco, m2_bloco = contadores
+            vitorias_par += vitorias_bloco
+            histograma += histograma_bloco
+            momentos_blocos[indice] = (media_bloco, m2_bloco)
+        
+        concluidos = self._executar_blocos(
+            partial(_simular_bloco_contadores, self.min_numero, self.max_numero),
+            n_simulacoes, seed, n_processos, registrar_bloco, callback_progresso, cancelar
+        )
+        
+        n_acumulado, media, m2 = 0, 0.0, 0.0
+        for indice in sorted(concluidos):
+            media_bloco, m2_bloco = momentos_blocos[indice]
+            n_acumulado, media, m2 = combinar_momentos(n_acumulado, media, m2, concluidos[indice],
+                                                       media_bloco, m2_bloco)
+        
+        return self._criar_resultado(n_acumulado, seed, 'paralelo', vitorias_par, inicio,
+                                     histograma, media, np.sqrt(m2 / n_acumulado))
+    
+    def _simular_paridade(self, n_simulacoes, seed, n_processos, callback_progresso, cancelar=None):
+        """Conta apenas vitórias par/ímpar a partir de bits de paridade compactados."""
+        inicio = time.time()
+        
+        vitorias_par = 0
+        
+        def registrar_bloco(indice, tamanho, vitorias_bloco):
+            nonlocal vitorias_par
+            vitorias_par += vitorias_bloco
+        
+        concluidos = self._executar_blocos(
+            partial(_simular_bloco_paridade, self.n_pares, self.range_numeros),
+            n_simulacoes, seed, n_processos, registrar_bloco, callback_progresso, cancelar
+        )
+        
+        return self._criar_resultado(sum(concluidos.values()), seed, 'paridade', vitorias_par, inicio)
+    
+    def _simular_compilado(self, n_simulacoes, seed, callback_progresso, cancelar=None):
+        """Simula com o gerador splitmix64 por contador, num único laço sem arrays temporários.
+        
+        Com Numba, sorteio, soma, paridade e histograma são fundidos num
+        kernel paralelo (prange); sem Numba, o mesmo gerador roda em blocos
+        NumPy, com resultado idêntico. Vitórias e momentos saem do histograma.
+        """
+        inicio = time.time()
+        chave = int(np.random.SeedSequence(seed).generate_state(1, dtype=np.uint64)[0])
+        usar_numba = numba_disponivel()
+        # O kernel Numba aguenta blocos maiores: não aloca nada por simulação
+        tamanho_bloco = TAMANHO_BLOCO_PARALELO * (16 if usar_numba else 1)
+        
+        histograma = np.zeros(2 * self.range_numeros - 1, dtype=np.int64)
+        n_acumulado = 0
+        while n_acumulado < n_simulacoes:
+            tamanho = min(tamanho_bloco, n_simulacoes - n_acumulado)
+            histograma += histograma_contador(chave, n_acumulado, tamanho, self.range_numeros, usar_numba)
+            n_acumulado += tamanho
+            if callback_progresso:
+                callback_progresso(n_acumulado / n_simulacoes)
+            if cancelar is not None and cancelar.is_set():
+                break
+        
+        deslocamentos = np.arange(len(histograma))
+        vitorias_par = int(histograma[deslocamentos % 2 == 0].sum())
+        somas = deslocamentos + 2 * self.min_numero
+        media = np.dot(somas, histograma) / n_acumulado
+        desvio_padrao = np.sqrt(np.dot((somas - media) ** 2, histograma) / n_acumulado)
+        return self._criar_resultado(n_acumulado, seed, 'compilado', vitorias_par, inicio,
+                                     histograma, media, desvio_padrao)
+    
+    def _simular_reducao_variancia(self, n_simulacoes, seed, metodo, tamanho_bloco, callback_progresso,
+                                   cancelar=None):
+        """Simula com amostragem estratificada, antitética ou por hipercubo latino.
+        
+        Cada jogador continua uniforme marginalmente, então histograma e
+        momentos das somas são acumulados como no modo streaming. P(par) é
+        estimada pelo estimador do método e a variância desse estimador
+        define o tamanho efetivo de amostra (n_efetivo) usado no intervalo.
+        
+        - estratificado: cada valor do jogador 1 é um estrato com alocação
+          proporcional; a variância entre estratos é eliminada.
+        - antitetico: cada sorteio (j1, j2) forma par com (j1, j2 + 1),
+          deslocado ciclicamente no intervalo; o deslocamento preserva a
+          uniforme e inverte a paridade da soma, exceto na volta do ciclo.
+        - hipercubo: lotes independentes de hipercubo latino em (j1, j2);
+          a variância vem da dispersão entre as médias dos lotes.
+        
+        cancelar interrompe após a rodada de estratos, o bloco de pares ou o
+        lote em andamento; o estimador usa só as unidades concluídas.
+        """
+        rng = np.random.default_rng(seed)
+        inicio = time.time()
+        
+        deslocamento = 2 * self.min_numero
+        histograma = np.zeros(2 * self.range_numeros - 1, dtype=np.int64)
+        n_acumulado, media, m2 = 0, 0.0, 0.0
+        
+        def acumular(somas):
+            """Registra um bloco de somas e devolve o indicador de soma par."""
+            nonlocal n_acumulado, media, m2, histograma
+            histograma += np.bincount(somas - deslocamento, minlength=len(histograma))
+            media_bloco = somas.mean()
+            m2_bloco = float(np.dot(somas - media_bloco, somas - media_bloco))
+            n_acumulado, media, m2 = combinar_momentos(n_acumulado, media, m2, len(somas), media_bloco, m2_bloco)
+            if callback_progresso:
+                callback_progresso(n_acumulado / n_simulacoes)
+            return (somas & 1) == 0
+        
+        def interromper():
+            return cancelar is not None and cancelar.is_set()
+        
+        if metodo == 'estratificado':
+            prob_par, variancia = self._estimar_estratificado(rng, n_simulacoes, tamanho_bloco, acumular, interromper)
+        elif metodo == 'antitetico':
+            prob_par, variancia = self._estimar_antitetico(rng, n_simulacoes, tamanho_bloco, acumular, interromper)
+        else:
+            prob_par, variancia = self._estimar_hipercubo(rng, n_simulacoes, acumular, interromper)
+        
+        # Variância nula (p. ex. antitético com range par) equivale a amostra infinita
+        n_efetivo = prob_par * (1 - prob_par) / variancia if variancia > 0 else float('inf')
+        estimativa = {
+            'metodo': metodo,
+            'prob_par': float(prob_par),
+            'variancia': float(variancia),
+            'n_efetivo': float(n_efetivo),
+            'ganho': float(n_efetivo / n_acumulado)
+        }
+        vitorias_par = int(histograma[(np.arange(len(histograma)) + deslocamento) % 2 == 0].sum())
+        return self._criar_resultado(n_acumulado, seed, metodo, vitorias_par, inicio, histograma,
+                                     media, np.sqrt(m2 / n_acumulado), estimativa_ajustada=estimativa)
+    
+    def _estimar_estratificado(self, rng, n_simulacoes, tamanho_bloco, acumular, interromper):
+        """Estratos pelo valor do jogador 1, alocação proporcional (resto em estratos sorteados).
+        
+        Os estratos são amostrados juntos, em rodadas de cerca de tamanho_bloco
+        sorteios, para que uma interrupção deixe amostras em todos eles.
+        """
+        if n_simulacoes < self.range_numeros:
+            raise ValueError(f"A amostragem estratificada exige ao menos {self.range_numeros} simulações "
+                             "(uma por valor do jogador 1).")
+        base, resto = divmod(n_simulacoes, self.range_numeros)
+        tamanhos = np.full(self.range_numeros, base, dtype=np.int64)
+        tamanhos[rng.permutation(self.range_numeros)[:resto]] += 1
+        
+        por_rodada = max(1, tamanho_bloco // self.range_numeros)
+        sorteados = np.zeros(self.range_numeros, dtype=np.int64)
+        pares = np.zeros(self.range_numeros, dtype=np.int64)
+        while sorteados.sum() < n_simulacoes:
+            tamanhos_rodada = np.minimum(por_rodada, tamanhos - sorteados)
+            estratos = np.repeat(np.arange(self.range_numeros), tamanhos_rodada)
+            somas = 2 * self.min_numero + estratos + rng.integers(0, self.range_numeros, len(estratos))
+            pares += np.bincount(estratos, weights=acumular(somas), minlength=self.range_numeros).astype(np.int64)
+            sorteados += tamanhos_rodada
+            if interromper():
+                break
+        
+        # Todos os estratos pesam 1/range (jogador 1 uniforme)
+        prob_estratos = pares / sorteados
+        prob_par = prob_estratos.mean()
+        variancia = np.sum(prob_estratos * (1 - prob_estratos) / sorteados) / self.range_numeros ** 2
+        return prob_par, variancia
+    
+    def _estimar_antitetico(self, rng, n_simulacoes, tamanho_bloco, acumular, interromper):
+        """Pares (j1, j2) e (j1, j2 deslocado); a variância vem das médias de cada par."""
+        if n_simulacoes < 2 or n_simulacoes % 2:
+            raise ValueError("A amostragem antitética exige um número par de simulações (ao menos 2).")
+        n_pares_amostras = n_simulacoes // 2
+        
+        # Médias dos pares valem 0, 1/2 ou 1: basta contar as de valor 1 e 1/2
+        ambos_pares, um_par, concluidos = 0, 0, 0
+        for inicio in range(0, n_pares_amostras, tamanho_bloco):
+            tamanho = min(tamanho_bloco, n_pares_amostras - inicio)
+            numeros_j1 = rng.integers(self.min_numero, self.max_numero + 1, tamanho)
+            numeros_j2 = rng.integers(self.min_numero, self.max_numero + 1, tamanho)
+            numeros_j2_antiteticos = np.where(numeros_j2 == self.max_numero, self.min_numero, numeros_j2 + 1)
+            pares = acumular(numeros_j1 + numeros_j2)
+            pares_antiteticos = acumular(numeros_j1 + numeros_j2_antiteticos)
+            ambos_pares += int(np.count_nonzero(pares & pares_antiteticos))
+            um_par += int(np.count_nonzero(pares ^ pares_antiteticos))
+            concluidos += tamanho
+            if interromper():
+                break
+        
+        prob_par = (ambos_pares + um_par / 2) / concluidos
+        segundo_momento = (ambos_pares + um_par / 4) / concluidos
+        variancia_par = max(segundo_momento - prob_par ** 2, 0.0)
+        if concluidos > 1:
+            variancia_par *= concluidos / (concluidos - 1)
+        return prob_par, variancia_par / concluidos
+    
+    def _estimar_hipercubo(self, rng, n_simulacoes, acumular, interromper):
+        """Lotes independentes de hipercubo latino; variância pela dispersão entre lotes.
+        
+        O resto de n_simulacoes / n_lotes é distribuído entre os lotes (tamanhos
+        diferem em no máximo 1), e as médias dos lotes são ponderadas pelo tamanho.
+        """
+        # Lotes suficientes para estimar a variância e limitar a memória de cada lote
+        n_lotes = max(LOTES_HIPERCUBO, -(-n_simulacoes // TAMANHO_BLOCO_PARALELO))
+        n_lotes = min(n_lotes, n_simulacoes // 2)
+        if n_lotes < 2:
+            raise ValueError("O hipercubo latino exige ao menos 4 simulações.")
+        base, resto = divmod(n_simulacoes, n_lotes)
+        tamanhos = np.full(n_lotes, base, dtype=np.int64)
+        tamanhos[:resto] += 1
+        
+        medias_lotes = []
+        for tamanho_lote in tamanhos:
+            numeros = []
+            for _ in range(2):
+                # Um ponto em cada uma das tamanho_lote faixas de [0, 1), em ordem aleatória
+                u = (rng.permutation(tamanho_lote) + rng.random(tamanho_lote)) / tamanho_lote
+                indices = np.minimum((u * self.range_numeros).astype(np.int64), self.range_numeros - 1)
+                numeros.append(self.min_numero + indices)
+            medias_lotes.append(acumular(numeros[0] + numeros[1]).mean())
+            # A variância entre lotes exige ao menos dois lotes concluídos
+            if len(medias_lotes) >= 2 and interromper():
+                break
+        
+        medias_lotes = np.array(medias_lotes)
+        tamanhos = tamanhos[:len(medias_lotes)]
+        n_concluidas = tamanhos.sum()
+        prob_par = np.dot(tamanhos, medias_lotes) / n_concluidas
+        # Var(média de um lote) ~ c / tamanho; c estimado pela dispersão ponderada entre lotes
+        c = np.dot(tamanhos, (medias_lotes - prob_par) ** 2) / (len(medias_lotes) - 1)
+        return prob_par, c / n_concluidas
+    
+    def intervalo_resultado(self, resultado, confianca=0.95):
+        """Intervalo de Wilson do resultado, com o tamanho efetivo de amostra quando houver."""
+        estimativa = resultado.estimativa_ajustada
+        if estimativa is None:
+            return self.calcular_intervalo_confianca(resultado.vitorias_par, resultado.n_simulacoes, confianca)
+        if np.isinf(estimativa['n_efetivo']):
+            return (estimativa['prob_par'], estimativa['prob_par'])
+        n_efetivo = estimativa['n_efetivo']
+        return self.calcular_intervalo_confianca(estimativa['prob_par'] * n_efetivo, n_efetivo, confianca)
+    
+    def simular_banca(self, n_trajetorias, n_jogos, banca_inicial=100, aposta=1, limite_ruina=0,
+                      aposta_em='par', seed=None, percentis=PERCENTIS_BANCA, n_pontos=PONTOS_BANCA,
+                      callback_progresso=None, cancelar=None):
+        """Simula n_trajetorias bancas ao longo de n_jogos partidas sucessivas.
+        
+        Em cada partida o jogador aposta 'aposta' em aposta_em ('par' ou
+        'impar') e ganha ou perde esse valor. A trajetória que chega a
+        limite_ruina ou abaixo para de jogar (tempo de primeira passagem).
+        Os resultados saem dos bits de paridade exatos dos dois jogadores,
+        como no modo paridade, e as trajetórias são somas acumuladas
+        calculadas em blocos (trajetórias × jogos) de tamanho limitado.
+        cancelar interrompe entre blocos de trajetórias.
+        """
+        if aposta_em not in ('par', 'impar'):
+            raise ValueError("aposta_em deve ser 'par' ou 'impar'.")
+        if aposta <= 0 or banca_inicial <= limite_ruina:
+            raise ValueError("A aposta deve ser positiva e a banca inicial maior que o limite de ruína.")
+        if seed is None:
+            seed = np.random.SeedSequence().entropy
+        rng = np.random.default_rng(seed)
+        inicio = time.time()
+        
+        # Trabalha em unidades de aposta: posição = vitórias - derrotas, ruína ao atingir nivel_ruina
+        nivel_ruina = (limite_ruina - banca_inicial) // aposta
+        pontos = np.unique(np.linspace(1, n_jogos, min(n_pontos, n_jogos)).round().astype(np.int64))
+        # Contagens das posições (de -n_jogos a n_jogos) em cada ponto de registro
+        contagens = np.zeros((len(pontos), 2 * n_jogos + 1), dtype=np.int64)
+        
+        colunas = min(n_jogos, COLUNAS_BLOCO_BANCA)
+        linhas = max(1, TAMANHO_BLOCO_BANCA // colunas)
+        tempos_ruina = np.full(n_trajetorias, -1, dtype=np.int64)
+        drawdowns = np.zeros(n_trajetorias, dtype=np.int64)
+        posicoes_finais = np.zeros(n_trajetorias, dtype=np.int64)
+        
+        n_concluidas = 0
+        for primeira in range(0, n_trajetorias, linhas):
+            fatia = slice(primeira, min(primeira + linhas, n_trajetorias))
+            posicao, drawdown, tempo = self._jogar_bloco_banca(
+                rng, fatia.stop - fatia.start, n_jogos, colunas, nivel_ruina, aposta_em, pontos, contagens
+            )
+            posicoes_finais[fatia], drawdowns[fatia], tempos_ruina[fatia] = posicao, drawdown, tempo
+            n_concluidas = fatia.stop
+            if callback_progresso:
+                callback_progresso(n_concluidas / n_trajetorias)
+            if cancelar is not None and cancelar.is_set():
+                break
+        
+        # Percentis de cada ponto a partir das contagens (mesma regra inferior de estatisticas_somas)
+        acumulado = np.cumsum(contagens, axis=1)
+        alvos = np.outer(np.asarray(percentis) / 100, acumulado[:, -1] - 1)
+        bandas = np.empty((len(percentis), len(pontos)))
+        for j in range(len(pontos)):
+            bandas[:, j] = np.searchsorted(acumulado[j], alvos[:, j], side='right') - n_jogos
+        
+        return ResultadoBanca(
+            n_concluidas, n_jogos, banca_inicial, aposta, limite_ruina, aposta_em, seed,
+            pontos, np.asarray(percentis), banca_inicial + bandas * aposta,
+            tempos_ruina[:n_concluidas], drawdowns[:n_concluidas] * aposta,
+            banca_inicial + posicoes_finais[:n_concluidas] * aposta, time.time() - inicio
+        )
+    
+    def _jogar_bloco_banca(self, rng, n_linhas, n_jogos, colunas, nivel_ruina, aposta_em, pontos, contagens):
+        """Joga n_linhas trajetórias completas, colunas jogos por vez, e registra os pontos."""
+        # Posições cabem em int32 (|posição| <= n_jogos), o que reduz o tráfego de memória
+        posicao = np.zeros(n_linhas, dtype=np.int32)
+        pico = np.zeros(n_linhas, dtype=np.int32)
+        drawdown = np.zeros(n_linhas, dtype=np.int32)
+        tempo_ruina = np.full(n_linhas, -1, dtype=np.int64)
+        
+        for jogo_inicial in range(0, n_jogos, colunas):
+            n_colunas = min(colunas, n_jogos - jogo_inicial)
+            n_bits = n_linhas * n_colunas
+            n_palavras = -(-n_bits // 64)
+            
+            # Bit 1 = soma ímpar (paridades dos jogadores diferentes), como no modo paridade
+            impares = gerar_bits_bernoulli(rng, n_palavras, self.n_pares, self.range_numeros)
+            impares ^= gerar_bits_bernoulli(rng, n_palavras, self.n_pares, self.range_numeros)
+            passos = np.unpackbits(impares.view(np.uint8), count=n_bits, bitorder='little').view(np.int8)
+            passos = passos.reshape(n_linhas, n_colunas)
+            # Vitória +1, derrota -1 para quem aposta em aposta_em
+            if aposta_em == 'impar':
+                passos *= 2
+                passos -= 1
+            else:
+                passos *= -2
+                passos += 1
+            
+            # Trajetórias arruinadas não jogam mais
+            passos[tempo_ruina >= 0] = 0
+            caminho = np.cumsum(passos, axis=1, dtype=np.int32)
+            caminho += posicao[:, None]
+            
+            # Primeira passagem pelo nível de ruína, só se alguma trajetória pode alcançá-lo neste trecho
+            if int(posicao.min()) - n_colunas <= nivel_ruina:
+                primeira_coluna = (caminho <= nivel_ruina).argmax(axis=1)
+                arruinadas = np.flatnonzero(
+                    (caminho[np.arange(n_linhas), primeira_coluna] <= nivel_ruina) & (tempo_ruina < 0)
+                )
+                if len(arruinadas):
+                    tempo_ruina[arruinadas] = jogo_inicial + primeira_coluna[arruinadas] + 1
+                    # Depois da ruína a banca fica parada no nível de ruína
+                    trecho = caminho[arruinadas]
+                    trecho[np.arange(n_colunas) >= primeira_coluna[arruinadas, None]] = nivel_ruina
+                    caminho[arruinadas] = trecho
+            
+            # Drawdown máximo: maior queda em relação ao pico acumulado
+            picos = np.maximum.accumulate(caminho, axis=1)
+            np.maximum(picos, pico[:, None], out=picos)
+            picos -= caminho
+            np.maximum(drawdown, picos.max(axis=1), out=drawdown)
+            pico = np.maximum(pico, caminho.max(axis=1))
+            posicao = caminho[:, -1].copy()
+            
+            # Pontos de registro (jogo p = coluna p - 1 - jogo_inicial) que caem neste trecho
+            for indice in np.flatnonzero((pontos > jogo_inicial) & (pontos <= jogo_inicial + n_colunas)):
+                coluna = caminho[:, pontos[indice] - 1 - jogo_inicial]
+                contagens[indice] += np.bincount(coluna + n_jogos, minlength=contagens.shape[1])
+        
+        return posicao, drawdown, tempo_ruina
+    
+    def testar_aderencia(self, resultado, minimo=FREQUENCIA_ESPERADA_MINIMA):
+        """Qui-quadrado e teste G do histograma de somas contra a distribuição exata."""
+        _, probabilidades = self.distribuicao_somas_teorica()
+        return teste_aderencia(resultado.histograma_somas, probabilidades, minimo)
+    
+    def replicar_aderencia(self, n_simulacoes, n_replicas, seed=None, modo='paralelo',
+                           n_processos=None, callback_progresso=None, cancelar=None):
+        """Repete a simulação n_replicas vezes e testa a aderência de cada réplica.
+        
+        Cada réplica recebe uma seed própria derivada de seed. Se o gerador
+        estiver correto, os p-valores são aproximadamente uniformes em
+        [0, 1]. Retorna um DataFrame com uma linha por réplica concluída
+        (menos que n_replicas, possivelmente nenhuma, se cancelar for
+        sinalizado; a réplica em andamento é descartada).
+        
+        modo='multinomial' não executa o simulador: sorteia cada histograma
+        diretamente da distribuição multinomial exata, em O(classes) por
+        réplica, o que permite estudar a calibração dos testes com milhões
+        de réplicas.
+        """
+        if modo == 'paridade':
+            raise ValueError("O modo somente paridade não registra as somas.")
+        if modo == 'multinomial':
+            return self._replicar_aderencia_multinomial(n_simulacoes, n_replicas, seed, callback_progresso,
+                                                        cancelar)
+        sementes = np.random.SeedSequence(seed).generate_state(n_replicas, dtype=np.uint64)
+        
+        histogramas = []
+        for indice, semente in enumerate(sementes):
+            progresso_replica = None
+            if callback_progresso:
+                progresso_replica = lambda fracao, indice=indice: callback_progresso((indice + fracao) / n_replicas)
+            resultado = self.simular(n_simulacoes, int(semente), modo=modo, n_processos=n_processos,
+                                     callback_progresso=progresso_replica, cancelar=cancelar)
+            # Uma réplica interrompida no meio teria menos simulações: fica de fora
+            if resultado.n_simulacoes < n_simulacoes:
+                break
+            histogramas.append(resultado.histograma_somas)
+            if cancelar is not None and cancelar.is_set():
+                break
+        
+        if not histogramas:
+            return pd.DataFrame(columns=['replica', 'seed', 'qui_quadrado', 'p_qui_quadrado', 'g', 'p_g'])
+        testes = teste_aderencia(np.vstack(histogramas), self.distribuicao_somas_teorica()[1])
+        return pd.DataFrame({
+            'replica': np.arange(len(histogramas)),
+            'seed': [str(semente) for semente in sementes[:len(histogramas)]],
+            'qui_quadrado': testes['qui_quadrado'],
+            'p_qui_quadrado': testes['p_qui_quadrado'],
+            'g': testes['g'],
+            'p_g': testes['p_g']
+        })
+    
+    def _replicar_aderencia_multinomial(self, n_simulacoes, n_replicas, seed, callback_progresso,
+                                        cancelar=None):
+        """Testa histogramas sorteados da multinomial exata, em blocos de réplicas.
+        
+        cancelar é verificado após cada bloco; os blocos concluídos são os
+        mesmos de uma execução completa com a mesma seed.
+        """
+        rng = np.random.default_rng(seed)
+        _, probabilidades = self.distribuicao_somas_teorica()
+        
+        blocos = []
+        for inicio in range(0, n_replicas, TAMANHO_BLOCO_REPLICAS):
+            tamanho = min(TAMANHO_BLOCO_REPLICAS, n_replicas - inicio)
+            testes = teste_aderencia(rng.multinomial(n_simulacoes, probabilidades, size=tamanho), probabilidades)
+            blocos.append(pd.DataFrame({
+                'qui_quadrado': testes['qui_quadrado'],
+                'p_qui_quadrado': testes['p_qui_quadrado'],
+                'g': testes['g'],
+                'p_g': testes['p_g']
+            }))
+            if callback_progresso:
+                callback_progresso((inicio + tamanho) / n_replicas)
+            if cancelar is not None and cancelar.is_set():
+                break
+        
+        df_replicas = pd.concat(blocos, ignore_index=True)
+        df_replicas.insert(0, 'replica', np.arange(len(df_replicas)))
+        return df_replicas
+    
+    def replicar_binomial(self, n_simulacoes, n_replicas, seed=None, confianca=0.95):
+        """Distribuição amostral de prob_par_obs sem executar o simulador.
+        
+        O número de vitórias de par de uma simulação é exatamente
+        Binomial(n_simulacoes, prob_teorica_par), então cada réplica custa
+        O(1) em vez de O(n). Retorna um DataFrame com as vitórias, a
+        proporção observada, o intervalo de Wilson e se ele cobre a
+        probabilidade teórica.
+        """
+        rng = np.random.default_rng(seed)
+        vitorias = rng.binomial(n_simulacoes, self.prob_teorica_par, n_replicas)
+        inferior, superior = intervalo_wilson(vitorias, n_simulacoes, confianca)
+        return pd.DataFrame({
+            'vitorias_par': vitorias,
+            'prob_par_obs': vitorias / n_simulacoes,
+            'ic_inferior': inferior,
+            'ic_superior': superior,
+            'cobre_teorico': (inferior <= self.prob_teorica_par) & (self.prob_teorica_par <= superior)
+        })
+    
+    def resumir_replicas_binomiais(self, df_replicas, n_simulacoes, confianca=0.95):
+        """Compara a distribuição amostral empírica com a teórica e mede a cobertura do IC."""
+        p = self.prob_teorica_par
+        n_replicas = len(df_replicas)
+        coberturas = int(df_replicas['cobre_teorico'].sum())
+        cobertura_inferior, cobertura_superior = intervalo_wilson(coberturas, n_replicas, confianca)
+        return {
+            'replicas': n_replicas,
+            'media_prob_obs': float(df_replicas['prob_par_obs'].mean()),
+            'desvio_prob_obs': float(df_replicas['prob_par_obs'].std()),
+            'desvio_teorico': float(np.sqrt(p * (1 - p) / n_simulacoes)),
+            'largura_media_ic': float((df_replicas['ic_superior'] - df_replicas['ic_inferior']).mean()),
+            'cobertura': coberturas / n_replicas,
+            'cobertura_ic_inferior': float(cobertura_inferior),
+            'cobertura_ic_superior': float(cobertura_superior),
+            'confianca_nominal': confianca
+        }
+    
+    def calcular_intervalo_confianca(self, sucessos, n_tentativas, confianca=0.95):
+        """Calcula intervalo de confiança usando método de Wilson."""
+        return intervalo_wilson(sucessos, n_tentativas, confianca)
+
+# Estratégias pré-definidas: nome -> rótulo exibido
+ESTRATEGIAS = {
+    'uniforme': "Uniforme",
+    'favorece_impares': "Favorece ímpares",
+    'favorece_pares': "Favorece pares",
+    'numeros_baixos': "Prefere números baixos",
+    'numeros_altos': "Prefere números altos"
+}
+
+def vetor_estrategia(estrategia, min_numero, max_numero):
+    """Vetor de probabilidades de uma estratégia pré-definida sobre [min_numero, max_numero]."""
+    numeros = np.arange(min_numero, max_numero + 1)
+    if estrategia == 'uniforme':
+        pesos = np.ones(len(numeros))
+    elif estrategia == 'favorece_impares':
+        pesos = np.where(numeros % 2 == 1, 2.0, 1.0)
+    elif estrategia == 'favorece_pares':
+        pesos = np.where(numeros % 2 == 0, 2.0, 1.0)
+    elif estrategia == 'numeros_baixos':
+        pesos = np.arange(len(numeros), 0, -1, dtype=float)
+    elif estrategia == 'numeros_altos':
+        pesos = np.arange(1, len(numeros) + 1, dtype=float)
+    else:
+        raise ValueError(f"Estratégia desconhecida: {estrategia}")
+    return pesos / pesos.sum()
+
+class SimuladorMultijogador:
+    """Par ou Ímpar com k jogadores, cada um com sua própria estratégia.
+    
+    Cada estratégia é um vetor de probabilidades sobre [min_numero, max_numero].
+    """
+    
+    def __init__(self, min_numero, max_numero, estrategias):
+        self.min_numero = min_numero
+        self.max_numero = max_numero
+        self.range_numeros = max_numero - min_numero + 1
+        self.estrategias = [self._normalizar(estrategia) for estrategia in estrategias]
+        self.n_jogadores = len(self.estrategias)
+        if self.n_jogadores < 2:
+            raise ValueError("São necessários pelo menos dois jogadores.")
+        self.prob_teorica_par, self.prob_teorica_impar = self._calcular_probabilidades_teoricas()
+        self._distribuicao_somas = None
+    
+    def _normalizar(self, estrategia):
+        probabilidades = np.asarray(estrategia, dtype=float)
+        if len(probabilidades) != self.range_numeros:
+            raise ValueError(f"Cada estratégia deve ter {self.range_numeros} probabilidades.")
+        if (probabilidades < 0).any() or probabilidades.sum() <= 0:
+            raise ValueError("As probabilidades de uma estratégia devem ser não negativas e não todas nulas.")
+        return probabilidades / probabilidades.sum()
+    
+    def _calcular_probabilidades_teoricas(self):
+        """Calcula P(par) exata em O(k·range).
+        
+        Com o_i a massa de ímpares do jogador i, E[(-1)^soma] = Π(1 - 2·o_i),
+        logo P(par) = (1 + Π(1 - 2·o_i)) / 2.
+        """
+        impares = (np.arange(self.min_numero, self.max_numero + 1) % 2) == 1
+        produto = np.prod([1 - 2 * estrategia[impares].sum() for estrategia in self.estrategias])
+        prob_par = (1 + produto) / 2
+        return prob_par, 1 - prob_par
+    
+    def distribuicao_somas_teorica(self):
+        """Retorna (somas, probabilidades) exatas: convolução das k estratégias."""
+        if self._distribuicao_somas is None:
+            probabilidades = self.estrategias[0]
+            for estrategia in self.estrategias[1:]:
+                probabilidades = convolver_distribuicoes(probabilidades, estrategia)
+            somas = np.arange(self.n_jogadores * self.min_numero, self.n_jogadores * self.max_numero + 1)
+            self._distribuicao_somas = (somas, probabilidades / probabilidades.sum())
+        return self._distribuicao_somas
+    
+    def simular(self, n_simulacoes, seed=None, tamanho_bloco=TAMANHO_BLOCO_PADRAO, callback_progresso=None):
+        """Executa simulação Monte Carlo em blocos com amostragem categórica vetorizada.
+        
+        Cada jogador sorteia por busca binária (searchsorted) de uniformes na
+        sua CDF, calculada uma única vez.
+        """
+        if seed is None:
+            seed = np.random.SeedSequence().entropy
+        rng = np.random.default_rng(seed)
+        
+        inicio = time.time()
+        
+        cdfs = [np.cumsum(estrategia) for estrategia in self.estrategias]
+        histograma = np.zeros(self.n_jogadores * (self.range_numeros - 1) + 1, dtype=np.int64)
+        vitorias_par = 0
+        n_acumulado, media, m2 = 0, 0.0, 0.0
+        
+        while n_acumulado < n_simulacoes:
+            tamanho = min(tamanho_bloco, n_simulacoes - n_acumulado)
+            
+            # Índices dentro do intervalo; a soma real é indices + k·min_numero
+            indices = np.zeros(tamanho, dtype=np.int64)
+            for cdf in cdfs:
+                sorteio = np.searchsorted(cdf, rng.random(tamanho), side='right')
+                # Arredondamento pode deixar cdf[-1] um pouco abaixo de 1
+                indices += np.minimum(sorteio, self.range_numeros - 1)
+            somas = indices + self.n_jogadores * self.min_numero
+            
+            vitorias_par += int(np.count_nonzero((somas & 1) == 0))
+            histograma += np.bincount(indices, minlength=len(histograma))
+            
+            media_bloco = somas.mean()
+            m2_bloco = float(np.dot(somas - media_bloco, somas - media_bloco))
+            n_acumulado, media, m2 = combinar_momentos(n_acumulado, media, m2, tamanho, media_bloco, m2_bloco)
+            
+            if callback_progresso:
+                callback_progresso(n_acumulado / n_simulacoes)
+        
+        return ResultadoSimulacao(
+            self.min_numero, self.max_numero, n_simulacoes, seed, 'estrategias', vitorias_par,
+            time.time() - inicio, histograma, media, np.sqrt(m2 / n_simulacoes),
+            n_jogadores=self.n_jogadores
+        )
+    
+    def calcular_intervalo_confianca(self, sucessos, n_tentativas, confianca=0.95):
+        """Calcula intervalo de confiança usando método de Wilson."""
+        return intervalo_wilson(sucessos, n_tentativas, confianca)
+
+def varrer_intervalos(limite_inferior=0, limite_superior=20, n_simulacoes=0, seed=None,
+                      confianca=0.95, tamanho_bloco=TAMANHO_BLOCO_PADRAO):
+    """Avalia todos os intervalos [min, max] com limite_inferior <= min < max <= limite_superior.
+    
+    As probabilidades teóricas de todas as configurações saem de uma única
+    operação vetorizada sobre as contagens de pares. Com n_simulacoes > 0,
+    cada configuração também recebe uma confirmação Monte Carlo: todas são
+    sorteadas juntas, em blocos de uma matriz (configurações × simulações).
+    """
+    valores = np.arange(limite_inferior, limite_superior + 1)
+    mins, maxs = np.nonzero(valores[:, None] < valores[None, :])
+    mins = valores[mins]
+    maxs = valores[maxs]
+    
+    range_numeros = maxs - mins + 1
+    n_pares = maxs // 2 - (mins - 1) // 2
+    n_impares = range_numeros - n_pares
+    prob_teorica_par = (n_pares ** 2 + n_impares ** 2) / range_numeros ** 2
+    
+    df_varredura = pd.DataFrame({
+        'min_numero': mins,
+        'max_numero': maxs,
+        'range_numeros': range_numeros,
+        'prob_teorica_par': prob_teorica_par,
+        'vies_teorico': prob_teorica_par - 0.5
+    })
+    
+    if n_simulacoes > 0:
+        rng = np.random.default_rng(seed)
+        dtype = dtype_numeros(limite_inferior, limite_superior)
+        inferiores = mins[:, None]
+        superiores = maxs[:, None] + 1
+        colunas_bloco = max(1, tamanho_bloco // len(mins))
+        vitorias_par = np.zeros(len(mins), dtype=np.int64)
+        
+        n_acumulado = 0
+        while n_acumulado < n_simulacoes:
+            colunas = min(colunas_bloco, n_simulacoes - n_acumulado)
+            paridades = rng.integers(inferiores, superiores, (len(mins), colunas), dtype=dtype)
+            paridades ^= rng.integers(inferiores, superiores, (len(mins), colunas), dtype=dtype)
+            # O bit menos significativo de j1 XOR j2 é a paridade da soma
+            vitorias_par += colunas - np.count_nonzero(paridades & 1, axis=1)
+            n_acumulado += colunas
+        
+        ic_inferior, ic_superior = intervalo_wilson(vitorias_par, n_simulacoes, confianca)
+        df_varredura['vitorias_par'] = vitorias_par
+        df_varredura['prob_par_obs'] = vitorias_par / n_simulacoes
+        df_varredura['vies_observado'] = df_varredura['prob_par_obs'] - 0.5
+        df_varredura['ic_inferior'] = ic_inferior
+        df_varredura['ic_superior'] = ic_superior
+        df_varredura['teorico_no_ic'] = (prob_teorica_par >= ic_inferior) & (prob_teorica_par <= ic_superior)
+    
+    return df_varredura
+
+# Resultados mantidos em memória pelo cache compartilhado entre sessões
+CAPACIDADE_CACHE_MEMORIA = 256
+
+# Arquivos mantidos pela camada em disco do cache
+CAPACIDADE_CACHE_DISCO = 4096
+
+# Diretório da camada em disco do cache; vazio desativa a camada
+DIRETORIO_CACHE_DISCO = os.environ.get('SIMULADOR_CACHE_DIR', '.cache_simulacoes')
+
+class CacheSimulacoes:
+    """Cache LRU de resultados de simulação, compartilhado entre sessões.
+    
+    A chave é (min_numero, max_numero, n_simulacoes, seed, modo). O número
+    de processos não entra porque não altera o resultado. Opcionalmente os
+    resultados também são gravados em disco (npz) e sobrevivem a reinícios.
+    """
+    
+    def __init__(self, capacidade=CAPACIDADE_CACHE_MEMORIA, diretorio=None,
+                 capacidade_disco=CAPACIDADE_CACHE_DISCO):
+        self.capacidade = capacidade
+        self.diretorio = diretorio
+        self.capacidade_disco = capacidade_disco
+        self._itens = OrderedDict()
+        self._trava = threading.Lock()
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+    
+    @staticmethod
+    def chave(min_numero, max_numero, n_simulacoes, seed, modo, convergencia=None):
+        """Monta a chave do cache para uma configuração.
+        
+        convergencia é o par (confianca, tolerancia) quando o acompanhamento
+        de convergência está ativo, pois a parada antecipada muda o resultado.
+        """
+        chave = (min_numero, max_numero, n_simulacoes, seed, modo)
+        if convergencia is not None:
+            chave += ('convergencia',) + tuple(convergencia)
+        return chave
+    
+    def _caminho(self, chave):
+        return os.path.join(self.diretorio, "sim_" + "_".join(str(parte) for parte in chave) + ".npz")
+    
+    def obter(self, chave):
+        """Retorna o resultado em cache ou None, consultando memória e depois disco."""
+        with self._trava:
+            if chave in self._itens:
+                self._itens.move_to_end(chave)
+                return self._itens[chave]
+        
+        if not self.diretorio:
+            return None
+        caminho = self._caminho(chave)
+        try:
+            resultado = ResultadoSimulacao.carregar(caminho)
+        except (OSError, ValueError, KeyError):
+            return None
+        self._guardar_memoria(chave, resultado)
+        return resultado
+    
+    def guardar(self, chave, resultado):
+        """Guarda o resultado em memória e, se configurado, em disco."""
+        self._guardar_memoria(chave, resultado)
+        if not self.diretorio:
+            return
+        
+        caminho = self._caminho(chave)
+        temporario = f"{caminho}.{threading.get_ident()}.tmp"
+        try:
+            with open(temporario, 'wb') as arquivo:
+                resultado.salvar(arquivo)
+            os.replace(temporario, caminho)
+            self._limitar_disco()
+        except OSError:
+            # A camada em disco é opcional: falhas de escrita não interrompem a simulação
+            if os.path.exists(temporario):
+                os.remove(temporario)
+    
+    def _guardar_memoria(self, chave, resultado):
+        with self._trava:
+            self._itens[chave] = resultado
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.capacidade:
+                self._itens.popitem(last=False)
+    
+    def _limitar_disco(self):
+        """Remove os arquivos usados há mais tempo quando o disco passa da capacidade."""
+        arquivos = [os.path.join(self.diretorio, nome) for nome in os.listdir(self.diretorio)
+                    if nome.endswith('.npz')]
+        if len(arquivos) <= self.capacidade_disco:
+            return
+        arquivos.sort(key=os.path.getmtime)
+        for caminho in arquivos[:len(arquivos) - self.capacidade_disco]:
+            try:
+                os.remove(caminho)
+            except OSError:
+                pass
+
+# Linhas por bloco na geração dos arquivos de dados detalhados
+TAMANHO_BLOCO_EXPORTACAO = 1 << 18
+
+# Arquivos de exportação maiores que isto vão da memória para o disco
+LIMITE_EXPORTACAO_MEMORIA = 32 * 1024 * 1024
+
+# Formatos de exportação dos dados detalhados: (rótulo, extensão, mime)
+FORMATOS_EXPORTACAO = {
+    'csv': ("CSV", "csv", "text/csv"),
+    'csv.gz': ("CSV compactado (gzip)", "csv.gz", "application/gzip"),
+    'parquet': ("Parquet (colunas categóricas)", "parquet", "application/vnd.apache.parquet"),
+    'npz': ("NumPy compactado (NPZ)", "npz", "application/octet-stream")
+}
+
+def formatos_exportacao_disponiveis():
+    """Formatos de exportação suportados no ambiente (Parquet exige pyarrow)."""
+    formatos = list(FORMATOS_EXPORTACAO)
+    if importlib.util.find_spec('pyarrow') is None:
+        formatos.remove('parquet')
+    return formatos
+
+def _blocos_detalhados(resultado):
+    """Gera os dados detalhados em DataFrames de TAMANHO_BLOCO_EXPORTACAO linhas."""
+    numeros_j1, numeros_j2, somas = resultado.materializar()
+    for inicio in range(0, resultado.n_simulacoes, TAMANHO_BLOCO_EXPORTACAO):
+        fatia = slice(inicio, inicio + TAMANHO_BLOCO_EXPORTACAO)
+        yield pd.DataFrame({
+            'Jogador_1': numeros_j1[fatia],
+            'Jogador_2': numeros_j2[fatia],
+            'Soma': somas[fatia],
+            # Código 0 = soma par, 1 = soma ímpar
+            'Resultado': pd.Categorical.from_codes(somas[fatia] & 1, categories=['Par', 'Ímpar'])
+        })
+
+def exportar_dados_detalhados(resultado, formato):
+    """Gera o arquivo de dados detalhados no formato pedido e o retorna aberto para leitura.
+    
+    Os sorteios são regenerados a partir da seed e escritos bloco a bloco
+    num arquivo temporário, sem montar o CSV inteiro como uma única string.
+    """
+    arquivo = tempfile.SpooledTemporaryFile(max_size=LIMITE_EXPORTACAO_MEMORIA)
+    
+    if formato in ('csv', 'csv.gz'):
+        destino = gzip.GzipFile(fileobj=arquivo, mode='wb', compresslevel=6) if formato == 'csv.gz' else arquivo
+        texto = io.TextIOWrapper(destino, encoding='utf-8', newline='')
+        for indice, bloco in enumerate(_blocos_detalhados(resultado)):
+            bloco.to_csv(texto, index=False, header=indice == 0)
+        # Solta o wrapper sem fechar o arquivo de destino
+        texto.flush()
+        texto.detach()
+        if formato == 'csv.gz':
+            destino.close()
+    elif formato == 'parquet':
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        escritor = None
+        for bloco in _blocos_detalhados(resultado):
+            tabela = pa.Table.from_pandas(bloco, preserve_index=False)
+            if escritor is None:
+                escritor = pq.ParquetWriter(arquivo, tabela.schema, compression='zstd')
+            escritor.write_table(tabela)
+        escritor.close()
+    elif formato == 'npz':
+        numeros_j1, numeros_j2, somas = resultado.materializar()
+        np.savez_compressed(arquivo, numeros_j1=numeros_j1, numeros_j2=numeros_j2, somas=somas)
+    else:
+        raise ValueError(f"Formato de exportação desconhecido: {formato}")
+    
+    arquivo.seek(0)
+    return arquivo
+
+def dados_detalhados_bytes(resultado, formato):
+    """Conteúdo de exportar_dados_detalhados como bytes.
+    
+    Para o download_button do Streamlit, que não aceita o arquivo temporário
+    (SpooledTemporaryFile) como retorno do callable de data.
+    """
+    with exportar_dados_detalhados(resultado, formato) as arquivo:
+        return arquivo.read()
+
+MODOS_SIMULACAO = ('vetorizado', 'streaming', 'paralelo', 'paridade', 'compilado') + METODOS_REDUCAO_VARIANCIA
+
+def resumo_simulacao(simulador, resultado, confianca=0.95):
+    """Resumo serializável em JSON de uma simulação."""
+    ic_inferior, ic_superior = simulador.intervalo_resultado(resultado, confianca)
+    resumo = {
+        'min_numero': resultado.min_numero,
+        'max_numero': resultado.max_numero,
+        'n_simulacoes': resultado.n_simulacoes,
+        'seed': str(resultado.seed),
+        'modo': resultado.modo,
+        'vitorias_par': resultado.vitorias_par,
+        'vitorias_impar': resultado.vitorias_impar,
+        'prob_par_obs': resultado.prob_par_obs,
+        'prob_par_teorica': simulador.prob_teorica_par,
+        'ic_inferior': float(ic_inferior),
+        'ic_superior': float(ic_superior),
+        'confianca': confianca,
+        'tempo_execucao': resultado.tempo_execucao
+    }
+    if resultado.estimativa_ajustada is not None:
+        # n_efetivo e ganho infinitos (variância nula) viram null: JSON não tem infinito
+        resumo['estimativa_ajustada'] = {
+            nome: None if valor == float('inf') else valor
+            for nome, valor in resultado.estimativa_ajustada.items()
+        }
+    if resultado.tem_somas:
+        resumo['estatisticas_somas'] = {
+            chave: float(valor) for chave, valor in resultado.estatisticas_somas().items()
+        }
+        resumo['aderencia'] = {
+            chave: float(valor) for chave, valor in simulador.testar_aderencia(resultado).items()
+        }
+    return resumo
+
+def _executar_simular(args):
+    """Subcomando 'simular': roda uma simulação e grava resultado, resumo e dados."""
+    simulador = SimuladorParOuImpar(args.min_numero, args.max_numero)
+    resultado = simulador.simular(
+        args.n_simulacoes, args.seed, modo=args.modo, n_processos=args.processos,
+        convergencia=args.convergencia, tolerancia=args.tolerancia, confianca=args.confianca
+    )
+    if args.saida:
+        resultado.salvar(args.saida)
+    if args.exportar:
+        if not resultado.regeneravel:
+            raise SystemExit("Dados detalhados só podem ser exportados no modo vetorizado.")
+        formato = args.exportar
+        caminho = args.arquivo_dados or f"dados_detalhados.{FORMATOS_EXPORTACAO[formato][1]}"
+        with exportar_dados_detalhados(resultado, formato) as origem, open(caminho, 'wb') as destino:
+            while bloco := origem.read(1 << 20):
+                destino.write(bloco)
+    
+    texto = json.dumps(resumo_simulacao(simulador, resultado, args.confianca), indent=2, ensure_ascii=False)
+    if args.resumo:
+        with open(args.resumo, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(texto + '\n')
+    else:
+        print(texto)
+
+def _executar_varrer(args):
+    """Subcomando 'varrer': avalia todos os intervalos e grava a tabela."""
+    df_varredura = varrer_intervalos(args.limite_inferior, args.limite_superior,
+                                     args.n_simulacoes, args.seed, args.confianca)
+    if args.saida is None:
+        print(df_varredura.to_string(index=False))
+    elif args.saida.endswith('.parquet'):
+        df_varredura.to_parquet(args.saida, index=False)
+    else:
+        df_varredura.to_csv(args.saida, index=False)
+
+def _executar_banca(args):
+    """Subcomando 'banca': simula bancas em jogos sucessivos e imprime o resumo em JSON."""
+    simulador = SimuladorParOuImpar(args.min_numero, args.max_numero)
+    banca = simulador.simular_banca(args.trajetorias, args.jogos, args.banca_inicial, args.aposta,
+                                    args.limite_ruina, args.aposta_em, args.seed)
+    ic_inferior, ic_superior = intervalo_wilson(banca.ruinas, banca.n_trajetorias, args.confianca)
+    tempos = banca.tempos_ruina[banca.tempos_ruina >= 0]
+    percentis = [int(p) for p in banca.percentis]
+    resumo = {
+        'n_trajetorias': banca.n_trajetorias,
+        'n_jogos': banca.n_jogos,
+        'seed': banca.seed,
+        'prob_ruina': banca.prob_ruina,
+        'ic_prob_ruina': [float(ic_inferior), float(ic_superior)],
+        'mediana_tempo_ruina': float(np.median(tempos)) if len(tempos) else None,
+        'percentis_drawdown': dict(zip(percentis, np.percentile(
+            banca.drawdowns_maximos, percentis, method='lower').tolist())),
+        'percentis_banca_final': dict(zip(percentis, banca.bandas[:, -1].tolist())),
+        'tempo_execucao': banca.tempo_execucao
+    }
+    print(json.dumps(resumo, indent=2, ensure_ascii=False, default=str))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulador Par ou Ímpar em linha de comando")
+    subcomandos = parser.add_subparsers(dest='comando', required=True)
+    
+    simular = subcomandos.add_parser('simular', help="executa uma simulação Monte Carlo")
+    simular.add_argument('--min', dest='min_numero', type=int, default=0)
+    simular.add_argument('--max', dest='max_numero', type=int, default=20)
+    simular.add_argument('-n', dest='n_simulacoes', type=int, default=10000)
+    simular.add_argument('--modo', choices=MODOS_SIMULACAO, default='streaming')
+    simular.add_argument('--seed', type=int, default=None)
+    simular.add_argument('--processos', type=int, default=None, help="processos dos modos paralelo e paridade")
+    simular.add_argument('--confianca', type=float, default=0.95)
+    simular.add_argument('--convergencia', action='store_true', help="registra a convergência (modo streaming)")
+    simular.add_argument('--tolerancia', type=float, default=None,
+                         help="para quando a meia-largura do intervalo ficar abaixo dela (modo streaming)")
+    simular.add_argument('--saida', help="arquivo .npz com o resultado (recarregável por ResultadoSimulacao.carregar)")
+    simular.add_argument('--resumo', help="arquivo JSON com o resumo (padrão: saída padrão)")
+    simular.add_argument('--exportar', choices=list(FORMATOS_EXPORTACAO),
+                         help="exporta também os sorteios detalhados (modo vetorizado)")
+    simular.add_argument('--arquivo-dados', help="destino dos dados detalhados")
+    simular.set_defaults(executar=_executar_simular)
+    
+    varrer = subcomandos.add_parser('varrer', help="avalia todos os intervalos [min, max]")
+    varrer.add_argument('--limite-inferior', type=int, default=0)
+    varrer.add_argument('--limite-superior', type=int, default=20)
+    varrer.add_argument('-n', dest='n_simulacoes', type=int, default=0,
+                        help="simulações Monte Carlo por intervalo (0 = apenas teórico)")
+    varrer.add_argument('--seed', type=int, default=None)
+    varrer.add_argument('--confianca', type=float, default=0.95)
+    varrer.add_argument('--saida', help="arquivo .csv ou .parquet (padrão: saída padrão)")
+    varrer.set_defaults(executar=_executar_varrer)
+    
+    banca = subcomandos.add_parser('banca', help="simula bancas em jogos sucessivos")
+    banca.add_argument('--min', dest='min_numero', type=int, default=0)
+    banca.add_argument('--max', dest='max_numero', type=int, default=20)
+    banca.add_argument('--trajetorias', type=int, default=10000)
+    banca.add_argument('--jogos', type=int, default=1000)
+    banca.add_argument('--banca-inicial', type=int, default=100)
+    banca.add_argument('--aposta', type=int, default=1)
+    banca.add_argument('--limite-ruina', type=int, default=0)
+    banca.add_argument('--aposta-em', choices=['par', 'impar'], default='par')
+    banca.add_argument('--seed', type=int, default=None)
+    banca.add_argument('--confianca', type=float, default=0.95)
+    banca.set_defaults(executar=_executar_banca)
+    
+    args = parser.parse_args(argv)
+    args.executar(args)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
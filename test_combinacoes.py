@@ -0,0 +1,67 @@
+"""Confere a solução exata das combinações contra uma busca exaustiva."""
+import itertools
+import random
+
+import pytest
+
+from combinacoes import calculate_combination_value, exact_combination_optimization
+
+
+def melhor_por_forca_bruta(item_prices, target_value, combination_size):
+    """Maior total (em centavos) que não ultrapassa a meta, testando todas as combinações."""
+    names = list(item_prices)
+    target_cents = int(round(target_value * 100))
+    best = 0
+    for size in range(1, min(combination_size, len(names)) + 1):
+        for subset in itertools.combinations(names, size):
+            cents = [int(round(item_prices[name] * 100)) for name in subset]
+            bounds = [range(1, target_cents // price + 1) for price in cents]
+            for quantities in itertools.product(*bounds):
+                total = sum(price * qty for price, qty in zip(cents, quantities))
+                if total <= target_cents:
+                    best = max(best, total)
+    return best
+
+
+def cardapios_pequenos():
+    rng = random.Random(0)
+    for _ in range(150):
+        item_prices = {f"item{i}": rng.choice([0.5, 1.5, 2.0, 3.5, 5.0, 7.5, 8.0, 12.0])
+                       for i in range(rng.randint(1, 4))}
+        yield item_prices, rng.randint(1, 60) / 2, rng.randint(1, 4)
+
+
+@pytest.mark.parametrize('item_prices, target_value, combination_size', list(cardapios_pequenos()))
+def test_exata_igual_a_forca_bruta(item_prices, target_value, combination_size):
+    combination = exact_combination_optimization(item_prices, target_value, combination_size)
+    total = int(round(calculate_combination_value(combination, item_prices) * 100))
+    assert total == melhor_por_forca_bruta(item_prices, target_value, combination_size)
+    assert all(isinstance(qty, int) and qty >= 1 for qty in combination.values())
+
+
+@pytest.mark.parametrize('combination_size', [1, 2, 3])
+def test_respeita_tamanho_da_combinacao(combination_size):
+    # Sem limite, a meta 37,00 exigiria os quatro itens (10 + 8 + 12 + 7)
+    item_prices = {"Suco": 10.0, "Refrigerante": 8.0, "Cerveja": 12.0, "Chá": 7.0}
+    combination = exact_combination_optimization(item_prices, 37.0, combination_size)
+    assert 1 <= len(combination) <= combination_size
+    total = int(round(calculate_combination_value(combination, item_prices) * 100))
+    assert total == melhor_por_forca_bruta(item_prices, 37.0, combination_size)
+
+
+@pytest.mark.parametrize('item_prices, target_value, combination_size', [
+    ({"Cerveja": 12.0, "Suco": 10.0}, 9.5, 2),
+    ({"Água": 5.0}, 0.0, 1),
+    ({"Água": 5.0}, -3.0, 1),
+    ({"Água": 5.0}, 20.0, 0),
+    ({}, 20.0, 3),
+])
+def test_meta_inalcancavel_retorna_vazio(item_prices, target_value, combination_size):
+    assert exact_combination_optimization(item_prices, target_value, combination_size) == {}
+
+
+def test_meta_sem_total_exato_fica_abaixo():
+    # Com preços pares, 25,00 não é alcançável: o melhor é 24,00 sem ultrapassar
+    item_prices = {"X Bacon": 22.0, "Refrigerante": 8.0, "Água": 6.0}
+    combination = exact_combination_optimization(item_prices, 25.0, 3)
+    assert calculate_combination_value(combination, item_prices) == 24.0
@@ -0,0 +1,30 @@
+"""Confere que os dados detalhados chegam ao download_button do Streamlit."""
+import gzip
+import io
+
+import numpy as np
+import pytest
+from streamlit.runtime.download_data_util import convert_data_to_bytes_and_infer_mime
+
+from simulador import SimuladorParOuImpar, dados_detalhados_bytes, formatos_exportacao_disponiveis
+
+
+@pytest.fixture(scope='module')
+def resultado():
+    return SimuladorParOuImpar(0, 20).simular(1000, 42, modo='vetorizado')
+
+
+@pytest.mark.parametrize('formato', formatos_exportacao_disponiveis())
+def test_download_aceito_pelo_streamlit(resultado, formato):
+    dados, _ = convert_data_to_bytes_and_infer_mime(
+        dados_detalhados_bytes(resultado, formato), RuntimeError("tipo não suportado")
+    )
+    if formato == 'csv':
+        assert dados.decode('utf-8').count('\n') == resultado.n_simulacoes + 1
+    elif formato == 'csv.gz':
+        assert gzip.decompress(dados).decode('utf-8').count('\n') == resultado.n_simulacoes + 1
+    elif formato == 'parquet':
+        import pyarrow.parquet as pq
+        assert pq.read_table(io.BytesIO(dados)).num_rows == resultado.n_simulacoes
+    elif formato == 'npz':
+        assert len(np.load(io.BytesIO(dados))['somas']) == resultado.n_simulacoes
@@ -0,0 +1,57 @@
+"""Confere partes do simulador contra probabilidades exatas e implementações ingênuas de referência."""
+import numpy as np
+import pytest
+
+from simulador import SimuladorParOuImpar, gerar_bits_bernoulli, intervalo_wilson
+
+
+@pytest.mark.parametrize('numerador, denominador', [
+    (0, 1), (1, 1), (1, 2), (1, 4), (3, 8), (13, 16), (1, 3), (10, 21), (11, 21), (2, 1000)
+])
+def test_bits_bernoulli_na_taxa_esperada(numerador, denominador):
+    n_palavras = 4096
+    palavras = gerar_bits_bernoulli(np.random.default_rng(123), n_palavras, numerador, denominador)
+    n_bits = 64 * n_palavras
+    uns = int(np.unpackbits(palavras.view(np.uint8)).sum())
+
+    p = numerador / denominador
+    if p in (0, 1):
+        assert uns == p * n_bits
+    else:
+        inferior, superior = intervalo_wilson(uns, n_bits, confianca=0.999)
+        assert inferior <= p <= superior
+
+
+def banca_ingenua(rng, p_vitoria, n_trajetorias, n_jogos, banca_inicial, aposta, limite_ruina):
+    """Soma acumulada direta de ±aposta; a banca fica parada a partir da ruína."""
+    passos = np.where(rng.random((n_trajetorias, n_jogos)) < p_vitoria, aposta, -aposta)
+    bancas = banca_inicial + np.cumsum(passos, axis=1)
+    arruinadas = bancas <= limite_ruina
+    ruina = arruinadas.any(axis=1)
+    primeira_ruina = arruinadas.argmax(axis=1)
+    finais = np.where(ruina, bancas[np.arange(n_trajetorias), primeira_ruina], bancas[:, -1])
+    return ruina, finais
+
+
+@pytest.mark.parametrize('aposta_em', ['par', 'impar'])
+def test_banca_igual_a_simulacao_ingenua(aposta_em):
+    simulador = SimuladorParOuImpar(0, 20)
+    n_trajetorias, n_jogos, banca_inicial, aposta, limite_ruina = 20000, 300, 20, 2, 5
+    resultado = simulador.simular_banca(n_trajetorias, n_jogos, banca_inicial, aposta, limite_ruina,
+                                        aposta_em=aposta_em, seed=7)
+    p_vitoria = simulador.prob_teorica_par if aposta_em == 'par' else simulador.prob_teorica_impar
+    ruina, finais = banca_ingenua(np.random.default_rng(8), p_vitoria, n_trajetorias, n_jogos,
+                                  banca_inicial, aposta, limite_ruina)
+
+    # Duas amostras independentes: a diferença das proporções de ruína fica dentro de 4 erros-padrão
+    p_ruina = (resultado.ruinas + ruina.sum()) / (2 * n_trajetorias)
+    erro_padrao = np.sqrt(2 * p_ruina * (1 - p_ruina) / n_trajetorias)
+    assert abs(resultado.prob_ruina - ruina.mean()) <= 4 * erro_padrao
+
+    # Bandas no último jogo: percentis (regra inferior) das bancas finais, próximos aos da simulação ingênua
+    assert resultado.pontos[-1] == n_jogos
+    np.testing.assert_array_equal(
+        resultado.bandas[:, -1], np.percentile(resultado.bancas_finais, resultado.percentis, method='lower')
+    )
+    ingenuos = np.percentile(finais, resultado.percentis, method='lower')
+    assert np.all(np.abs(resultado.bandas[:, -1] - ingenuos) <= 2 * aposta)